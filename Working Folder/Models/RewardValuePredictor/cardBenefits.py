@@ -0,0 +1,126 @@
+"""
+Annual fees and sign-up bonuses from ccBenefits/ccbenefits_v2_cleaned.csv, joined to the
+catalog cards and folded into the ranking.
+
+The csv is parsed once per process into typed columns (fees and bonus values as floats,
+'1.50%' strings as 0.015 fractions) and indexed by normalized card name, so rankings can
+report first-year and steady-state net value without touching the csv again.
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+BENEFITS_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ccBenefits',
+                            'ccbenefits_v2_cleaned.csv')
+
+
+def normalizeCardName(name):
+    """
+    Name used to join cards across sources: lower case, '&' as 'and', punctuation and
+    trademark signs dropped, trailing 'credit card' / 'card' removed.
+
+    'Chase Sapphire Preferred® Card' -> 'chase sapphire preferred'
+    """
+    name = name.lower().replace('&', ' and ')
+    name = re.sub(r'[^a-z0-9]+', ' ', name).strip()
+    name = re.sub(r'( credit)? card$', '', name)
+    return name
+
+
+def _percent(values):
+    # '1.50%' -> 0.015, blanks stay NaN
+    return pd.to_numeric(values.str.rstrip('%'), errors='coerce') / 100.0
+
+
+class CardBenefits:
+    def __init__(self, path=BENEFITS_CSV):
+        raw = pd.read_csv(path)
+        self.table = pd.DataFrame({
+            'Credit Card': raw['Credit Card'],
+            'Annual Fee': pd.to_numeric(raw['Annual Fee'], errors='coerce').astype(np.float64),
+            'Sign Up Bonus': pd.to_numeric(raw['Estimated Bonus Value ($)'], errors='coerce').astype(np.float64),
+            'Sign Up Bonus Type': raw['Sign Up Bonus Type'],
+            'Reward Type': raw['Credit Card Reward Type'],
+            'Cash Back Rate': _percent(raw['Cash Back Percentage']),
+            'Main Discount Rate': _percent(raw['Main Discount Percentage']),
+            'Main Discount Type': raw['Main Discount Type'],
+        })
+        self.index = {}
+        for row, name in enumerate(self.table['Credit Card']):
+            key = normalizeCardName(name)
+            if key in self.index:
+                raise ValueError("%s: %r and %r normalize to the same name" % (
+                    path, self.table['Credit Card'][self.index[key]], name))
+            self.index[key] = row
+        self._joined = {}
+
+    def lookup(self, card_name):
+        """
+        Benefits row of a card as a Series, or None when the csv does not list it.
+        """
+        row = self.index.get(normalizeCardName(card_name))
+        return None if row is None else self.table.iloc[row]
+
+    def for_matrix(self, matrix):
+        """
+        Fees and bonuses aligned to a RewardMatrix's cards, computed once per matrix.
+
+        Parameters:
+        matrix (RewardMatrix): Cards to join
+
+        Returns:
+        tuple: (annual fee per card, sign-up bonus value per card, matched mask). Cards the
+            csv does not list get 0 fee and 0 bonus
+        """
+        if matrix.fingerprint not in self._joined:
+            rows = np.array([self.index.get(normalizeCardName(name), -1) for name in matrix.card_names])
+            matched = rows >= 0
+            fees = np.zeros(len(rows))
+            bonuses = np.zeros(len(rows))
+            fees[matched] = self.table['Annual Fee'].to_numpy()[rows[matched]]
+            bonuses[matched] = self.table['Sign Up Bonus'].to_numpy()[rows[matched]]
+            self._joined[matrix.fingerprint] = (np.nan_to_num(fees), np.nan_to_num(bonuses), matched)
+        return self._joined[matrix.fingerprint]
+
+
+_benefits = None
+
+
+def getBenefits():
+    """
+    The benefits table, parsed once per process.
+    """
+    global _benefits
+    if _benefits is None:
+        _benefits = CardBenefits()
+    return _benefits
+
+
+def netValueRanking(matrix, annual_spend, benefits=None):
+    """
+    Rank cards by net value on a year of spend.
+
+    Parameters:
+    matrix (RewardMatrix): Cards to rank
+    annual_spend (array-like): Spend per category over a year (RewardMatrix category order)
+    benefits (CardBenefits, optional): Defaults to getBenefits()
+
+    Returns:
+    pd.DataFrame: One row per card with Rewards, Annual Fee, Sign Up Bonus,
+        First Year Net Value (rewards + bonus - fee) and Steady State Net Value
+        (rewards - fee), best steady-state value first
+    """
+    benefits = getBenefits() if benefits is None else benefits
+    fees, bonuses, _ = benefits.for_matrix(matrix)
+    rewards = matrix.score_profiles(annual_spend)
+    ranking = pd.DataFrame({
+        'Credit Card': matrix.card_names,
+        'Rewards': rewards,
+        'Annual Fee': fees,
+        'Sign Up Bonus': bonuses,
+        'First Year Net Value': rewards + bonuses - fees,
+        'Steady State Net Value': rewards - fees,
+    })
+    return ranking.sort_values('Steady State Net Value', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,191 @@
+"""
+Credit card catalog loaded from data instead of module-level CreditCard literals.
+
+cardCatalog.json is the editable source: every card has an id (the name it used to have
+as a module variable, e.g. 'chase_sapphire_preferred'), its display name, the
+points/cashback flag, point value and reward_structure, plus the ordered list of ids
+that make up card_database. compileCatalog() validates it, normalizes every rate into
+dollars of value per dollar spent (see creditCardValueClass.effectiveRates) and writes
+cardCatalog.pkl, a pickled index with an integer id per card; CardCatalog loads that
+index and only builds CreditCard objects for the cards that are actually asked for.
+
+Run this file to compile the catalog after editing cardCatalog.json. Loading also
+recompiles on its own when the json is newer than the index.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+from creditCardValueClass import CreditCard, effectiveRates
+
+CATALOG_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_SOURCE = os.path.join(CATALOG_DIR, 'cardCatalog.json')
+CATALOG_INDEX = os.path.join(CATALOG_DIR, 'cardCatalog.pkl')
+CATALOG_INDEX_FORMAT = 2
+
+
+def _validateCard(card):
+    """
+    Check a catalog record and compile its effective dollar rates.
+    """
+    card_id = card.get('id')
+    for field in ('id', 'name', 'cashback_points', 'point_value', 'reward_structure'):
+        if field not in card:
+            raise ValueError("catalog card %r is missing %r" % (card_id, field))
+    if card['cashback_points'] not in ('points', 'cashback'):
+        raise ValueError("%s: cashback_points must be 'points' or 'cashback', got %r" % (card_id, card['cashback_points']))
+    if not isinstance(card['point_value'], (int, float)) or card['point_value'] <= 0:
+        raise ValueError("%s: point_value must be a positive number, got %r" % (card_id, card['point_value']))
+    try:
+        return effectiveRates(card['reward_structure'], card['cashback_points'], card['point_value'])
+    except ValueError as e:
+        raise ValueError("%s: %s" % (card_id, e)) from None
+
+
+def compileCatalog(source=CATALOG_SOURCE, index=CATALOG_INDEX):
+    """
+    Validate the catalog json and write the compiled index.
+
+    Parameters:
+    source (str): Catalog json
+    index (str): Compiled index to write
+
+    Returns:
+    dict: The compiled index
+    """
+    with open(source, 'rb') as f:
+        raw = f.read()
+    catalog = json.loads(raw)
+
+    ids, records, id_index = [], [], {}
+    for card in catalog['cards']:
+        effective_rates = _validateCard(card)
+        if card['id'] in id_index:
+            raise ValueError("%s: duplicate card id %r" % (source, card['id']))
+        id_index[card['id']] = len(ids)
+        ids.append(card['id'])
+        records.append((card['name'], card['reward_structure'], card['cashback_points'], card['point_value'],
+                        card.get('group'), effective_rates))
+
+    for card_id in catalog['card_database']:
+        if card_id not in id_index:
+            raise ValueError("%s: card_database lists unknown card %r" % (source, card_id))
+    database = [id_index[card_id] for card_id in catalog['card_database']]
+
+    # a display name shared by several ids resolves to the card_database one, else the first
+    name_index = {}
+    for i, record in enumerate(records):
+        name_index.setdefault(record[0], i)
+    for i in database:
+        name_index[records[i][0]] = i
+
+    compiled = {
+        'format': CATALOG_INDEX_FORMAT,
+        'version': catalog['version'],
+        'fingerprint': hashlib.sha256(raw).hexdigest()[:16],
+        'ids': ids,
+        'id_index': id_index,
+        'name_index': name_index,
+        'records': records,
+        'card_database': database,
+    }
+    tmp_path = index + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index)
+    return compiled
+
+
+class CardCatalog:
+    def __init__(self, compiled):
+        self.version = compiled['version']
+        self.fingerprint = compiled['fingerprint']  # changes whenever the json does
+        self.ids = compiled['ids']
+        self._id_index = compiled['id_index']
+        self._name_index = compiled['name_index']
+        self._records = compiled['records']
+        self._database = compiled['card_database']
+        self._cards = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, key):
+        return key in self._id_index or key in self._name_index
+
+    def card_id(self, key):
+        """
+        Integer id of a card, given its catalog id ('chase_sapphire_preferred') or display
+        name ('Chase Sapphire Preferred').
+        """
+        if key in self._id_index:
+            return self._id_index[key]
+        if key in self._name_index:
+            return self._name_index[key]
+        raise KeyError("no card %r in the catalog" % key)
+
+    def get(self, key):
+        """
+        The CreditCard for a catalog id, display name or integer id, built on first use.
+        """
+        i = key if isinstance(key, int) else self.card_id(key)
+        if i not in self._cards:
+            name, reward_structure, cashback_points, point_value, _, effective_rates = self._records[i]
+            self._cards[i] = CreditCard(name, dict(reward_structure), cashback_points, point_value,
+                                        dict(effective_rates))
+        return self._cards[i]
+
+    def group(self, key):
+        """
+        Section of the catalog a card is listed under (e.g. 'Chase Cards').
+        """
+        return self._records[self.card_id(key)][4]
+
+    def cards(self, keys=None):
+        """
+        CreditCards for keys, or every card in the catalog.
+        """
+        return [self.get(key) for key in (range(len(self.ids)) if keys is None else keys)]
+
+    def database(self):
+        """
+        The cards making up card_database, in order.
+        """
+        return [self.get(i) for i in self._database]
+
+
+def loadCatalog(source=CATALOG_SOURCE, index=CATALOG_INDEX):
+    """
+    Load the compiled catalog, recompiling first if the json is newer than the index.
+    """
+    if not os.path.exists(index) or os.path.getmtime(index) < os.path.getmtime(source):
+        return CardCatalog(compileCatalog(source, index))
+    with open(index, 'rb') as f:
+        compiled = pickle.load(f)
+    if compiled.get('format') != CATALOG_INDEX_FORMAT:
+        compiled = compileCatalog(source, index)
+    return CardCatalog(compiled)
+
+
+_catalog = None
+
+
+def getCatalog():
+    """
+    The default catalog, loaded once per process.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = loadCatalog()
+    return _catalog
+
+
+def getCard(key):
+    return getCatalog().get(key)
+
+
+if __name__ == '__main__':
+    compiled = compileCatalog()
+    print("compiled %d cards (%d in card_database) into %s" % (len(compiled['ids']), len(compiled['card_database']),
+                                                            CATALOG_INDEX))
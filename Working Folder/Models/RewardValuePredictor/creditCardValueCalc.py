@@ -1,106 +1,280 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
 from creditCardValueClass import *
+from cardCatalog import getCatalog
+
+import modelsPath  # noqa: F401
+from instrumentation import count, stage
+
+
+def rollingCount(csv_path, store_path, mcc_version='v1'):
+    """
+    Keeps a grand total of every cc's est reward value per (User, Card) in a persistent
+    store (see rewardAccumulator.py). Only transactions appended to csv_path since the last
+    run are read, so re-running nightly costs O(new rows).
+
+    Parameters:
+    csv_path (str): Preprocessed transactions csv with User, Card, Amount and MCC columns
+    store_path (str): .npz accumulator store, created on the first run
+    mcc_version (str): Version of the MCC mapping file to use for a new store
+
+    Returns:
+    RewardAccumulator: The updated store
+    """
+    from rewardAccumulator import RewardAccumulator
 
+    if os.path.exists(store_path):
+        store = RewardAccumulator.load(store_path)
+    else:
+        store = RewardAccumulator(mcc_version=mcc_version)
+    store.ingest(csv_path)
+    store.save(store_path)
+    return store
 
-def rollingCount():
+def categorizeTransaction(csv_path, output_path=None, mcc_version='v1', description_column='Description',
+                          keywords_version='v1'):
     """
-    will keep a grand total of any given cc's est reward value for user
+    Adds a 'category' column to a transactions csv by mapping each row's MCC to a
+    reward category (see mccCategories.py), then, where the csv has merchant
+    descriptions, overriding it with the brand category a description names
+    (see merchantCategories.py), e.g. 'AMZN Mktp US' -> 'Amazon.com'.
+
+    Parameters:
+    csv_path (str): Preprocessed transactions csv with an MCC column
+    output_path (str, optional): Where to write the categorized csv, nothing is written if None
+    mcc_version (str): Version of the MCC mapping file to use
+    description_column (str): Column holding merchant descriptions, skipped if the csv has none
+    keywords_version (str): Version of the merchant keyword file to use
+
+    Returns:
+    pd.DataFrame: Transactions with the new 'category' column
     """
-    pass
+    from mccCategories import getLookup
+    from merchantCategories import getMatcher
+
+    df = pd.read_csv(csv_path)
+    lookup = getLookup(mcc_version)
+    category_ids = lookup.categorize(df['MCC'])
+    if description_column in df.columns:
+        matched = getMatcher(keywords_version).categorize(df[description_column])
+        category_ids = np.where(matched > 0, matched, category_ids)
+    df['category'] = lookup.category_names(category_ids)
+    if output_path is not None:
+        df.to_csv(output_path, index=False)
+    return df
+
+_worker_matrix = None
+_worker_rotating = None
+
+
+def _initScoringWorker(rotating=False):
+    # each worker compiles the card matrix (and rotating rates) once instead of once per chunk
+    global _worker_matrix, _worker_rotating
+    from rewardMatrix import RewardMatrix
+    from rotatingRates import RotatingRates
+    _worker_matrix = RewardMatrix(card_database)
+    _worker_rotating = RotatingRates(_worker_matrix) if rotating else None
+
+
+def _chunkTotals(matrix, rotating, amounts, category_ids, months):
+    # rows with a month get the rotating categories of its quarter, the rest flat rates
+    if months is None:
+        return matrix.totals(amounts, category_ids)
+    dated = months > 0
+    totals = rotating.totals(amounts[dated], category_ids[dated], months[dated])
+    if not dated.all():
+        totals += matrix.totals(amounts[~dated], category_ids[~dated])
+    return totals
+
 
-def categorizeTransaction():
+def _scoreChunk(amounts, category_ids, months=None):
+    return _chunkTotals(_worker_matrix, _worker_rotating, amounts, category_ids, months)
+
+
+def _readChunks(csv_path, chunk_size, mcc_version, months=False):
+    from mccCategories import getLookup
+
+    lookup = getLookup(mcc_version)
+    columns = ['Amount', 'MCC'] + (['Month'] if months else [])
+    reader = iter(pd.read_csv(csv_path, usecols=columns, chunksize=chunk_size))
+    while True:
+        with stage('load') as loading:
+            chunk = next(reader, None)
+            if chunk is not None:
+                loading.add_rows(len(chunk))
+        if chunk is None:
+            return
+        with stage('dropna', len(chunk)):
+            rows = len(chunk)
+            chunk = chunk.dropna(subset=['Amount', 'MCC'])
+            count('rows_dropped', rows - len(chunk))
+        # a missing Month is 0, scored without rotating categories
+        chunk_months = chunk['Month'].fillna(0).to_numpy(dtype=np.int64) if months else None
+        yield chunk['Amount'].to_numpy(dtype=np.float64), lookup.categorize(chunk['MCC'].to_numpy()), chunk_months
+
+
+def loopCreditCardDB(csv_path, chunk_size=100000, workers=None, output_path=None, mcc_version='v1',
+                     net_value=False, years=1.0, rotating=True):
     """
-    will create a new table in csv file called 'category' and categorize transactions based on
-    descriptions
+    Totals the est reward value of every credit card in card_database over a transactions csv
+    and saves down the ranking for the credit card recommendation system.
+
+    With net_value the cards are ranked by rewards minus annual fees (from cardBenefits.py,
+    one fee per year the csv covers), the steady-state net value netValueRanking reports.
+
+    When the csv has a Month column, rotating category cards earn their rotating rate on
+    the categories of each transaction's quarter (rotatingRates.py, the calendar's latest
+    year), instead of only their default rate.
+
+    The csv is streamed in chunks of chunk_size rows, each chunk is scored against every card
+    in a process pool and folded into the running per-card totals in chunk order, so only a
+    few chunks are in memory at once and the result is identical to the serial path
+    (workers=1) whatever the worker count.
+
+    Parameters:
+    csv_path (str): Preprocessed transactions csv with Amount and MCC columns
+    chunk_size (int): Rows per chunk
+    workers (int, optional): Worker processes, defaults to os.cpu_count(), 1 runs serially
+    output_path (str, optional): csv to save the ranking to
+    mcc_version (str): Version of the MCC mapping file to use
+    net_value (bool): Rank by rewards minus annual fees instead of gross rewards
+    years (float): Years of transactions in the csv, annual fees are charged this many times
+    rotating (bool): Score quarterly rotating categories from the Month column, if there is one
+
+    Returns:
+    list: (card name, est reward value) tuples, or (card name, est net value) with
+        net_value, highest value first
     """
-    pass
+    from rewardMatrix import RewardMatrix
+    from rotatingRates import RotatingRates
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    matrix = RewardMatrix(card_database)
+    rotating = rotating and 'Month' in pd.read_csv(csv_path, nrows=0).columns
+    running_totals = np.zeros(len(matrix), dtype=np.float64)
+    chunks = _readChunks(csv_path, chunk_size, mcc_version, months=rotating)
+
+    if workers <= 1:
+        rotating_rates = RotatingRates(matrix) if rotating else None
+        for amounts, category_ids, months in chunks:
+            running_totals += _chunkTotals(matrix, rotating_rates, amounts, category_ids, months)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initScoringWorker,
+                                 initargs=(rotating,)) as pool:
+            # bounded window of in-flight chunks, drained oldest first to keep the sum order fixed
+            pending = deque()
+            for amounts, category_ids, months in chunks:
+                pending.append((pool.submit(_scoreChunk, amounts, category_ids, months), len(amounts)))
+                if len(pending) >= 2 * workers:
+                    future, rows = pending.popleft()
+                    # workers score in their own processes, so 'score' here is the time spent
+                    # waiting on them, kept apart from the load/dropna of the next chunks
+                    with stage('score', rows):
+                        running_totals += future.result()
+            while pending:
+                future, rows = pending.popleft()
+                with stage('score', rows):
+                    running_totals += future.result()
 
-def loopCreditCardDB():
+    if net_value:
+        from cardBenefits import getBenefits
+        running_totals -= getBenefits().for_matrix(matrix)[0] * years
+    ranking = matrix.rank(running_totals)
+    if output_path is not None:
+        value_column = 'Estimated Net Value ($)' if net_value else 'Estimated Reward Value ($)'
+        pd.DataFrame(ranking, columns=['Credit Card', value_column]).to_csv(output_path, index=False)
+    return ranking
+
+def rankUsersCapped(csv_path, top=None, output_path=None, mcc_version='v1', batch_rows=1000000,
+                    net_value=False, years=1.0):
     """
-    will running rollingCount() function on each credit card in card_database and save down
-    results somewhere to be easily accessed by credit card recommendation system
+    Ranks every card in card_database for every user with spend caps, tiers, rotating
+    categories and top-category / category-of-choice rules applied (spendCaps.py,
+    rotatingRates.py, dynamicCategories.py), so custom-cash style cards earn their bonus
+    rate up to their cap instead of only their default rate.
+
+    Caps and picked categories are per user, so the rows are grouped by user and scored by
+    CapEngine a batch of whole users at a time, about batch_rows rows per batch, and each
+    batch is summed into one row of card values per user.
+
+    Parameters:
+    csv_path (str): Preprocessed transactions csv with User, Amount, MCC and Month columns
+        (Year, Day and Time are used when present)
+    top (int, optional): Only return the best top cards per user
+    output_path (str, optional): csv to save the ranking to, one row per user and rank
+    mcc_version (str): Version of the MCC mapping file to use
+    batch_rows (int): Rows scored per batch of users
+    net_value (bool): Rank by rewards minus annual fees instead of gross rewards
+    years (float): Years of transactions in the csv, annual fees are charged this many times
+
+    Returns:
+    tuple: (users, users x top card indexes into card_database best first,
+            users x top reward (or net) values in dollars)
     """
-    pass
-
-# Create a database of cards
-card_database = [
-  chase_freedom_flex,
-  chase_ink_business_preferred,
-  chase_world_of_hyatt,
-  amex_green,
-  amex_everyday,
-  amex_everyday_preferred,
-  amex_cash_magnet,
-  discover_it_miles,
-  discover_it_chrome,
-  capital_one_venture_x,
-  capital_one_savor,
-  capital_one_savorone,
-  citi_premier,
-  citi_prestige,
-  citi_custom_cash,
-  citi_rewards_plus,
-  bank_of_america_travel_rewards,
-  bank_of_america_unlimited_cash_rewards,
-  bank_of_america_premium_rewards,
-  wells_fargo_autograph,
-  us_bank_altitude_reserve,
-  us_bank_altitude_go,
-  barclays_arrival_plus,
-  barclays_jetblue_plus,
-  hsbc_cash_rewards,
-  td_bank_double_up,
-  usaa_rewards_visa,
-  navy_federal_cash_rewards,
-  chase_ink_business_cash,
-  chase_ink_business_unlimited,
-  chase_freedom_student,
-  chase_ihg_rewards_premier,
-  chase_marriott_bonvoy_boundless,
-  amex_blue_business_plus,
-  amex_business_gold,
-  amex_business_platinum,
-  amex_hilton_honors,
-  amex_hilton_honors_surpass,
-  discover_it_secured,
-  capital_one_spark_cash_plus,
-  capital_one_spark_miles,
-  citi_aadvantage_platinum_select,
-  citi_aadvantage_executive,
-  citi_aadvantage_mileup,
-  bank_of_america_alaska_airlines,
-  bank_of_america_spirit_airlines,
-  bank_of_america_cash_rewards_students,
-  us_bank_altitude_connect,
-  us_bank_flexperks_gold,
-  barclays_aadvantage_aviator_red,
-  barclays_wyndham_rewards_earner,
-  synchrony_amazon_prime_store_card,
-  pnc_cash_rewards,
-  td_bank_cash_credit_card,
-  pentagon_federal_platinum_rewards,
-  chase_southwest_rapid_rewards_plus,
-  chase_united_explorer,
-  chase_united_quest,
-  amex_delta_skymiles_blue,
-  amex_delta_skymiles_gold,
-  bank_of_america_royal_caribbean,
-  bank_of_america_world_wildlife_fund,
-  comenity_wayfair_credit_card,
-  usaa_rewards_american_express,
-  pentagon_federal_gold_visa,
-  pentagon_federal_power_cash_rewards,
-  chase_sapphire_preferred,
-  chase_sapphire_reserve,
-  chase_freedom_unlimited,
-  amex_gold,
-  amex_platinum,
-  amex_blue_cash_preferred,
-  discover_it_cashback,
-  capital_one_venture,
-  capital_one_quicksilver,
-  citi_double_cash,
-  bofa_cash_rewards
-]
+    from dynamicCategories import DynamicCategories
+    from mccCategories import getLookup
+    from rewardMatrix import RewardMatrix
+    from rotatingRates import RotatingRates
+    from spendCaps import CapEngine, timeOrderKey
+    from spendProfile import rankValues
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if 'Month' not in header:
+        raise ValueError("%s has no Month column, caps and rotating categories are tracked by month" % csv_path)
+    columns = [name for name in ['User', 'Year', 'Month', 'Day', 'Time', 'Amount', 'MCC'] if name in header]
+    with stage('load') as loading:
+        df = pd.read_csv(csv_path, usecols=columns)
+        loading.add_rows(len(df))
+    with stage('dropna', len(df)):
+        rows = len(df)
+        df = df.dropna().sort_values('User', kind='stable')  # a user's rows contiguous, in file order
+        count('rows_dropped', rows - len(df))
+
+    matrix = RewardMatrix(card_database)
+    engine = CapEngine(matrix, rotating=RotatingRates(matrix), dynamic=DynamicCategories(matrix))
+    users = df['User'].to_numpy(dtype=np.int64)
+    months = df['Month'].to_numpy(dtype=np.int64)
+    amounts = df['Amount'].to_numpy(dtype=np.float64)
+    category_ids = getLookup(mcc_version).categorize(df['MCC'].to_numpy())
+    order_key = timeOrderKey(df) if 'Day' in df.columns else None
+    year_values = df['Year'].to_numpy(dtype=np.int64) if 'Year' in df.columns else None
 
+    unique_users, starts = np.unique(users, return_index=True)
+    values = np.zeros((len(unique_users), len(matrix)), dtype=np.float64)
+    bounds = np.append(starts, len(users))
+    first = 0
+    with stage('score', len(users)):
+        while first < len(unique_users):
+            # whole users only, at least one even if they alone exceed batch_rows
+            last = max(first + 1, int(np.searchsorted(bounds, bounds[first] + batch_rows, side='right')) - 1)
+            last = min(last, len(unique_users))
+            begin, end = bounds[first], bounds[last]
+            batch = slice(begin, end)
+            scored = engine.score(users[batch], months[batch], amounts[batch], category_ids[batch],
+                                  None if order_key is None else order_key[batch],
+                                  None if year_values is None else year_values[batch])
+            values[first:last] = np.add.reduceat(scored, bounds[first:last] - begin, axis=1).T
+            first = last
 
+    if net_value:
+        from cardBenefits import getBenefits
+        values -= getBenefits().for_matrix(matrix)[0] * years
+    order, ranked = rankValues(values, top)
+    if output_path is not None:
+        value_column = 'Estimated Net Value ($)' if net_value else 'Estimated Reward Value ($)'
+        pd.DataFrame({
+            'User': np.repeat(unique_users, order.shape[1]),
+            'Rank': np.tile(np.arange(1, order.shape[1] + 1), len(unique_users)),
+            'Credit Card': np.asarray(matrix.card_names, dtype=object)[order].ravel(),
+            value_column: ranked.ravel(),
+        }).to_csv(output_path, index=False)
+    return unique_users, order, ranked
 
+# Create a database of cards, the list of card ids lives in cardCatalog.json
+card_database = getCatalog().database()
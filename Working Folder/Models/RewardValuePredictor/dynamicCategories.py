@@ -0,0 +1,149 @@
+"""
+'Highest spending category', 'Top 2 Business Categories', 'Choice Category' and similar
+rules, where the bonus category is whichever of a list of categories a user spends the
+most on in a billing cycle (or would pick, for category-of-choice cards).
+
+dynamicCategories_<version>.csv has one rule per card:
+
+    Card           catalog id of the card
+    Rule Category  the reward_structure key holding the bonus rate
+    Top N          number of categories earning the bonus per cycle
+    Cycle          'month', 'quarter' or 'year' the top categories are picked over
+    Choices        '|' separated categories that can be picked, '*' for any
+
+Category-of-choice cards are valued as if the user picks the best categories every cycle.
+DynamicCategories builds a (user, cycle) x categories spend matrix once per distinct rule,
+finds the top N columns of every row with argpartition and turns them into per-transaction
+eligibility masks, which CapEngine applies at the rule's rate and under the card's cap.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cardCatalog import getCatalog
+from spendCaps import loadSpendCaps, periodKey
+
+DYNAMIC_CATEGORIES_VERSION = 'v1'
+RULES_DIR = os.path.dirname(os.path.abspath(__file__))
+CYCLES = ('year', 'quarter', 'month')
+
+
+def loadDynamicCategories(version=DYNAMIC_CATEGORIES_VERSION, path=None):
+    """
+    Read and check a dynamic category rules file.
+
+    Returns:
+    pd.DataFrame: One row per rule
+    """
+    path = os.path.join(RULES_DIR, 'dynamicCategories_%s.csv' % version) if path is None else path
+    rules = pd.read_csv(path, dtype={'Card': str, 'Rule Category': str, 'Top N': np.int64, 'Cycle': str,
+                                     'Choices': str})
+    catalog = getCatalog()
+    for rule in rules.to_dict('records'):
+        if rule['Card'] not in catalog:
+            raise ValueError("%s: unknown card %r" % (path, rule['Card']))
+        if rule['Rule Category'] not in catalog.get(rule['Card']).reward_structure:
+            raise ValueError("%s: %r has no %r rate" % (path, rule['Card'], rule['Rule Category']))
+        if rule['Cycle'] not in CYCLES or rule['Top N'] < 1:
+            raise ValueError("%s: %r needs a Cycle in %s and a Top N of at least 1" % (path, rule['Card'], CYCLES))
+    return rules
+
+
+def topCategories(groups, n_groups, amounts, category_ids, n_categories, top, choices=None):
+    """
+    The top categories by spend of every group.
+
+    Parameters:
+    groups (np.ndarray): Group (e.g. user and cycle) code per transaction, 0..n_groups-1
+    n_groups (int): Number of groups
+    amounts (np.ndarray): Transaction amounts in dollars
+    category_ids (np.ndarray): Category id per transaction
+    n_categories (int): Number of categories
+    top (int): Categories picked per group
+    choices (np.ndarray, optional): Bool mask of the categories that can be picked
+
+    Returns:
+    np.ndarray: groups x categories bool, True for a group's top categories with spend
+    """
+    spend = np.bincount(groups * n_categories + category_ids, weights=amounts,
+                        minlength=n_groups * n_categories).reshape(n_groups, n_categories)
+    if choices is not None:
+        spend[:, ~choices] = 0.0
+    picked = np.zeros(spend.shape, dtype=bool)
+    if top >= n_categories:
+        picked[:] = True
+    else:
+        # only the order of the top columns matters, so partition instead of sorting
+        columns = np.argpartition(-spend, top - 1, axis=1)[:, :top]
+        np.put_along_axis(picked, columns, True, axis=1)
+    return picked & (spend > 0)
+
+
+class DynamicCategories:
+    def __init__(self, matrix, rules=None, caps=None):
+        """
+        Parameters:
+        matrix (RewardMatrix): Cards to score
+        rules (pd.DataFrame, optional): From loadDynamicCategories(), the default version if None
+        caps (pd.DataFrame, optional): The loadSpendCaps() rules CapEngine applies, the default
+            version if None. Every card needs one, CapEngine only uses the eligibility of
+            cards it has a rule for
+        """
+        self.matrix = matrix
+        rules = loadDynamicCategories() if rules is None else rules
+        capped = set((loadSpendCaps() if caps is None else caps)['Card'])
+        catalog = getCatalog()
+        self.rules = []
+        for rule in rules.to_dict('records'):
+            if rule['Card'] not in capped:
+                raise ValueError("%r has no spend cap rule, add one with its Rule Category %r so CapEngine applies it"
+                                 % (rule['Card'], rule['Rule Category']))
+            choices = None
+            if rule['Choices'] != '*':
+                choices = np.zeros(len(matrix.categories), dtype=bool)
+                for category in rule['Choices'].split('|'):
+                    if category not in matrix.category_index:
+                        raise ValueError("choice %r of %r is not a RewardMatrix category" % (category, rule['Card']))
+                    choices[matrix.category_index[category]] = True
+            name = catalog.get(rule['Card']).name
+            for card in (i for i, card_name in enumerate(matrix.card_names) if card_name == name):
+                self.rules.append({'card': card, 'top': rule['Top N'], 'cycle': rule['Cycle'], 'choices': choices})
+
+    def eligible(self, users, months, amounts, categories, years=None):
+        """
+        Transactions in each dynamic card's picked categories for their user and cycle.
+
+        Parameters:
+        users (array-like): User per transaction
+        months (array-like): Month (1-12) per transaction
+        amounts (array-like): Transaction amounts in dollars
+        categories (array-like): Category ids or strings
+        years (array-like, optional): Year per transaction, one year assumed if None
+
+        Returns:
+        dict: card index -> bool mask over transactions, as CapEngine takes
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        ids = self.matrix.category_ids(categories)
+        users = np.asarray(users, dtype=np.int64)
+        months = np.asarray(months, dtype=np.int64)
+        years = np.zeros(len(amounts), dtype=np.int64) if years is None else np.asarray(years, dtype=np.int64)
+
+        masks = {}
+        picked_by_rule = {}
+        groups_by_cycle = {}
+        for rule in self.rules:
+            cycle = rule['cycle']
+            if cycle not in groups_by_cycle:
+                groups, unique_groups = pd.factorize(users * 100000 + periodKey(cycle, years, months))
+                groups_by_cycle[cycle] = (groups, len(unique_groups))
+            groups, n_groups = groups_by_cycle[cycle]
+
+            # cards sharing a rule (e.g. the same issuer's variants) share the spend matrix
+            key = (cycle, rule['top'], None if rule['choices'] is None else rule['choices'].tobytes())
+            if key not in picked_by_rule:
+                picked_by_rule[key] = topCategories(groups, n_groups, amounts, ids, len(self.matrix.categories),
+                                                    rule['top'], rule['choices'])
+            masks[rule['card']] = picked_by_rule[key][groups, ids]
+        return masks
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from creditCardValueCalc import creditCardCategories
+
+MCC_SLOTS = 10000  # MCCs are 4 digit codes, so 0000-9999 covers all of them
+MCC_MAPPING_VERSION = 'v1'
+MAPPING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def mappingPath(version=MCC_MAPPING_VERSION):
+    return os.path.join(MAPPING_DIR, 'mccCategories_%s.csv' % version)
+
+
+class MCCLookup:
+    """
+    MCC -> reward category id as a flat 10,000 slot array, so categorizing a column of
+    MCCs is a single array index instead of a dict lookup per row.
+
+    Category ids are positions in creditCardCategories (0 is 'default'), which are also
+    the first columns of RewardMatrix, so categorize() output can be passed straight to
+    RewardMatrix.score().
+    """
+
+    def __init__(self, table, version, categories=None):
+        self.table = table
+        self.version = version
+        self.categories = np.array(creditCardCategories if categories is None else categories, dtype=object)
+
+    @classmethod
+    def load(cls, version=MCC_MAPPING_VERSION, path=None):
+        """
+        Compile a mapping file into a lookup table.
+
+        Mapping files are CSVs with 'MCC Start', 'MCC End' and 'Category' columns, where
+        ranges are inclusive and later rows override earlier ones.
+
+        Parameters:
+        version (str): Mapping version, picks mccCategories_<version>.csv
+        path (str, optional): Explicit mapping file, overrides version
+
+        Returns:
+        MCCLookup: Compiled lookup
+        """
+        path = mappingPath(version) if path is None else path
+        mapping = pd.read_csv(path, dtype={'MCC Start': np.int64, 'MCC End': np.int64, 'Category': str})
+        category_index = {category: i for i, category in enumerate(creditCardCategories)}
+
+        table = np.zeros(MCC_SLOTS, dtype=np.int16)
+        for start, end, category in mapping[['MCC Start', 'MCC End', 'Category']].itertuples(index=False):
+            if category not in category_index:
+                raise ValueError("%s: unknown category %r for MCC %d-%d" % (path, category, start, end))
+            if not 0 <= start <= end < MCC_SLOTS:
+                raise ValueError("%s: bad MCC range %d-%d" % (path, start, end))
+            table[start:end + 1] = category_index[category]
+        return cls(table, version)
+
+    def categorize(self, mcc):
+        """
+        Map a whole column of MCCs to category ids at once.
+
+        Parameters:
+        mcc (array-like): MCC codes (NumPy array, pandas Series or list). Missing or
+            out of range codes map to 'default'
+
+        Returns:
+        np.ndarray: int16 category ids, one per MCC
+        """
+        mcc = np.asarray(mcc)
+        if mcc.dtype.kind not in 'iuf':
+            mcc = pd.to_numeric(pd.Series(mcc), errors='coerce').to_numpy(dtype=np.float64)
+
+        valid = (mcc >= 0) & (mcc < MCC_SLOTS)  # NaN compares False
+        if mcc.dtype.kind != 'f' and valid.all():
+            return self.table[mcc]
+        return np.where(valid, self.table[np.where(valid, mcc, 0).astype(np.int64)], 0).astype(np.int16)
+
+    def category_names(self, ids):
+        """
+        Category strings for an array of category ids.
+        """
+        return self.categories[np.asarray(ids)]
+
+
+_lookups = {}
+
+
+def getLookup(version=MCC_MAPPING_VERSION):
+    """
+    Load a mapping version once per process and reuse it.
+    """
+    if version not in _lookups:
+        _lookups[version] = MCCLookup.load(version)
+    return _lookups[version]
+
+
+def categorize(mcc, version=MCC_MAPPING_VERSION):
+    """
+    Vectorized MCC -> category id using the cached lookup for version.
+    """
+    return getLookup(version).categorize(mcc)
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from creditCardValueCalc import creditCardCategories
+
+MERCHANT_KEYWORDS_VERSION = 'v1'
+KEYWORDS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def keywordsPath(version=MERCHANT_KEYWORDS_VERSION):
+    return os.path.join(KEYWORDS_DIR, 'merchantKeywords_%s.csv' % version)
+
+
+def normalizeDescription(text):
+    """
+    Lower case with every run of non letters/digits as one space, padded with a space on
+    both sides so keywords only match whole words ('rei' in 'rei com' but not in 'reid').
+    """
+    out = []
+    space = True
+    for ch in text.lower():
+        if ch.isalnum():
+            out.append(ch)
+            space = False
+        elif not space:
+            out.append(' ')
+            space = True
+    return ' ' + ''.join(out).strip() + ' '
+
+
+class MerchantMatcher:
+    """
+    Merchant description -> reward category id with an Aho-Corasick automaton over the
+    keyword list, so every keyword is searched for in one left-to-right pass over a
+    description, however many keywords there are.
+
+    Brand categories ('Amazon.com', 'Whole Foods', 'Delta Purchases', ...) cannot be told
+    apart by MCC, so a match here overrides the MCC category. The longest matching keyword
+    wins, ties go to the earlier row of the keyword file. Ids are positions in
+    creditCardCategories, like MCCLookup's, and 0 means no keyword matched.
+
+    Each distinct description is matched once: categorize() factorizes the column first
+    and results are memoized across calls, so ledgers with the same merchants over and
+    over only pay for the merchants they have not seen yet.
+    """
+
+    def __init__(self, keywords, version, memo_size=1000000):
+        category_index = {category: i for i, category in enumerate(creditCardCategories)}
+        self.version = version
+        self.memo_size = memo_size
+        self._memo = {}
+
+        # goto[state] maps a character to the next state, match[state] is the best keyword
+        # ending there as (length, -priority, category id)
+        self._goto = [{}]
+        self._match = [None]
+        for priority, (keyword, category) in enumerate(keywords):
+            if category not in category_index:
+                raise ValueError("unknown category %r for keyword %r" % (category, keyword))
+            pattern = normalizeDescription(keyword)
+            state = 0
+            for ch in pattern:
+                if ch not in self._goto[state]:
+                    self._goto.append({})
+                    self._match.append(None)
+                    self._goto[state][ch] = len(self._goto) - 1
+                state = self._goto[state][ch]
+            candidate = (len(pattern), -priority, category_index[category])
+            if self._match[state] is None or candidate > self._match[state]:
+                self._match[state] = candidate
+
+        # failure links breadth first, each state inherits the best match of its fallback
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        while queue:
+            next_queue = []
+            for state in queue:
+                for ch, child in self._goto[state].items():
+                    fallback = self._fail[state]
+                    while fallback and ch not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[child] = self._goto[fallback].get(ch, 0)
+                    inherited = self._match[self._fail[child]]
+                    if inherited is not None and (self._match[child] is None or inherited > self._match[child]):
+                        self._match[child] = inherited
+                    next_queue.append(child)
+            queue = next_queue
+
+    @classmethod
+    def load(cls, version=MERCHANT_KEYWORDS_VERSION, path=None):
+        """
+        Compile a keyword file ('Keyword', 'Category' columns) into a matcher.
+        """
+        path = keywordsPath(version) if path is None else path
+        keywords = pd.read_csv(path, dtype=str)
+        try:
+            return cls(keywords[['Keyword', 'Category']].itertuples(index=False), version)
+        except ValueError as e:
+            raise ValueError("%s: %s" % (path, e)) from None
+
+    def match(self, description):
+        """
+        Category id of one description, 0 if no keyword matches.
+        """
+        if description in self._memo:
+            return self._memo[description]
+        goto, fail, match = self._goto, self._fail, self._match
+        state = 0
+        best = None
+        for ch in normalizeDescription(description):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found = match[state]
+            if found is not None and (best is None or found > best):
+                best = found
+        category = 0 if best is None else best[2]
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[description] = category
+        return category
+
+    def categorize(self, descriptions):
+        """
+        Match a whole column of descriptions.
+
+        Parameters:
+        descriptions (array-like): Merchant description strings, missing values map to 0
+
+        Returns:
+        np.ndarray: int16 category ids, one per description
+        """
+        codes, uniques = pd.factorize(np.asarray(descriptions, dtype=object))
+        ids = np.array([self.match(str(description)) for description in uniques] + [0], dtype=np.int16)
+        return ids[codes]  # factorize marks missing values -1, which picks the trailing 0
+
+
+_matchers = {}
+
+
+def getMatcher(version=MERCHANT_KEYWORDS_VERSION):
+    """
+    Load a keyword version once per process and reuse it.
+    """
+    if version not in _matchers:
+        _matchers[version] = MerchantMatcher.load(version)
+    return _matchers[version]
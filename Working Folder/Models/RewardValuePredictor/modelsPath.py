@@ -0,0 +1,14 @@
+"""
+Puts the Models folder on sys.path, for the modules shared by both model folders
+(instrumentation.py). The only place in this folder that touches sys.path; import it
+right before a shared module:
+
+    import modelsPath  # noqa: F401
+    from instrumentation import stage
+"""
+import os
+import sys
+
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if MODELS_DIR not in sys.path:
+    sys.path.append(MODELS_DIR)
@@ -0,0 +1,167 @@
+"""
+Cache of card rankings keyed by quantized spend profile.
+
+Many users spend nearly the same per category, so their rankings are the same. A
+profile is rounded to multiples of `quantum` dollars per category only to build the key,
+hashed together with the RewardMatrix fingerprint (which changes whenever the matrix's
+cards or rates do). The entry is the full card order of the first profile ranked in that
+bucket; a profile served from it gets the bucket's top cards but their values computed
+on its own, unrounded spend (and re-sorted by them), so a $425 profile is never valued
+as $420 and a $4 profile is not valued at $0. Entries are evicted least recently used
+beyond max_entries and expire after ttl seconds; a new fingerprint drops every entry of
+the old matrix.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from spendProfile import rankProfiles
+
+
+class RankingCache:
+    def __init__(self, max_entries=10000, ttl=3600.0, quantum=10.0):
+        """
+        Parameters:
+        max_entries (int): Rankings kept before the least recently used is dropped
+        ttl (float): Seconds an entry stays valid, None to never expire
+        quantum (float): Dollars per category spend is rounded to before hashing
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.quantum = quantum
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def key(self, spend, version, net_value=False):
+        """
+        Cache key of one spend profile: its spend rounded to quantum-dollar buckets, the
+        matrix fingerprint and whether the ranking is by net value (rewards minus fees).
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(version.encode())
+        digest.update(b'net' if net_value else b'gross')
+        digest.update(np.rint(np.asarray(spend, dtype=np.float64) / self.quantum).astype(np.int64).tobytes())
+        return digest.digest()
+
+    def _check_version(self, version):
+        # a catalog change makes every entry stale
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and entry[0] < time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._check_version(version)
+            expires = time.monotonic() + self.ttl if self.ttl is not None else None
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+def valueOrder(matrix, spend, order, top, annual_fees=None):
+    """
+    The first top cards of a cached order, valued on one profile's actual spend and
+    sorted by that value.
+
+    Parameters:
+    matrix (RewardMatrix): Cards the order indexes
+    spend (np.ndarray): One categories spend vector
+    order (np.ndarray): Card indexes, best first for the profile's bucket
+    top (int): Cards to return
+    annual_fees (np.ndarray, optional): Fee per card subtracted from the values, as in rankProfiles
+
+    Returns:
+    tuple: (top card indexes, their reward (or net) values), best first
+    """
+    cards = np.asarray(order[:top])
+    values = matrix.rates[cards] @ np.asarray(spend, dtype=np.float64)
+    if annual_fees is not None:
+        values -= annual_fees[cards]
+    resort = np.argsort(-values, kind='stable')
+    return cards[resort], values[resort]
+
+
+def rankCached(matrix, spend, cache, top=None, annual_fees=None):
+    """
+    rankProfiles() through a RankingCache: hits are answered from the cache, the misses
+    are ranked together in one call and stored.
+
+    Parameters:
+    matrix (RewardMatrix): Cards to rank
+    spend (np.ndarray): profiles x categories spend matrix
+    cache (RankingCache): Cache to use
+    top (int, optional): Only return the best top cards per profile
+    annual_fees (np.ndarray, optional): Fee per card subtracted before ranking, as in rankProfiles
+
+    Returns:
+    tuple: (profiles x top card indexes, profiles x top reward (or net) values on each
+        profile's own spend), best first
+    """
+    version = matrix.fingerprint
+    net_value = annual_fees is not None
+    spend = np.atleast_2d(np.asarray(spend, dtype=np.float64))
+    top = len(matrix) if top is None else min(top, len(matrix))
+    order = np.empty((len(spend), top), dtype=np.int64)
+    values = np.empty((len(spend), top), dtype=np.float64)
+
+    # profiles sharing a bucket within one call share a single lookup
+    rows_by_key = {}
+    for i, row in enumerate(spend):
+        rows_by_key.setdefault(cache.key(row, version, net_value), []).append(i)
+
+    missed = []
+    for key, rows in rows_by_key.items():
+        cached = cache.get(key, version)
+        if cached is None:
+            missed.append(key)
+        else:
+            for row in rows:
+                order[row], values[row] = valueOrder(matrix, spend[row], cached, top, annual_fees)
+
+    if missed:
+        # the first profile of each bucket is ranked exactly, and its full order cached so
+        # any later top can be served from it
+        first = [rows_by_key[key][0] for key in missed]
+        miss_order, miss_values = rankProfiles(matrix, spend[first], annual_fees=annual_fees)
+        for key, row, full_order, full_values in zip(missed, first, miss_order, miss_values):
+            cache.put(key, version, full_order)
+            order[row], values[row] = full_order[:top], full_values[:top]
+            for other in rows_by_key[key][1:]:
+                order[other], values[other] = valueOrder(matrix, spend[other], full_order, top, annual_fees)
+    return order, values
@@ -0,0 +1,380 @@
+"""
+Card recommendation HTTP service, standard library only.
+
+    python recommendationService.py --port 8080
+
+POST /rank with a JSON body holding either a spend profile or a batch of transactions:
+
+    {"spend": {"Dining - Restaurants": 420.0, "Gas Stations": 130.5}, "top": 5}
+    {"transactions": [{"Amount": 12.5, "MCC": 5812}, {"Amount": 40.0, "MCC": 5541}]}
+
+and get back card_database ranked by reward value on that spend:
+
+    {"cards": [{"card": "...", "value": 21.0}, ...]}
+
+With "net_value": true in the body (or --net-value for every request) the spend is taken
+as a year's and cards are ranked by rewards minus annual fee (see cardBenefits.py).
+
+GET /stats reports request count, throughput, p50/p99 latency, the mean batch size and
+the ranking cache's hit/miss counters.
+
+Requests are not scored one at a time. Each one is turned into a spend vector and queued;
+a single batcher task takes everything that arrives within window_ms of the first queued
+request (up to max_batch), stacks it into a profiles x categories matrix and ranks all of
+it with one rankProfiles() call, then answers every request of the batch. With --cache,
+the batch goes through rankCached() instead (see rankingCache.py): profiles whose bucket
+is in the RankingCache are valued from the cached order, only the others are ranked.
+
+When the service builds its own matrix from the catalog it checks cardCatalog.json at
+most every catalog_check seconds and, if the file changed, reloads the catalog and ranks
+with the new cards from then on; the cache drops its entries on the new fingerprint.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from cardBenefits import getBenefits
+from cardCatalog import CATALOG_SOURCE, loadCatalog
+from mccCategories import getLookup
+from rankingCache import RankingCache, rankCached
+from rewardMatrix import RewardMatrix
+from spendProfile import rankProfiles
+
+MAX_BODY = 8 * 1024 * 1024
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+               500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ServiceStats:
+    """
+    Latency and throughput of answered requests, latencies over the last `window` requests.
+    """
+
+    def __init__(self, window=10000):
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record(self, seconds):
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000.0
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'uptime_s': round(elapsed, 3),
+            'throughput_rps': round(self.requests / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_p50_ms': round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+            'latency_p99_ms': round(float(np.percentile(latencies, 99)), 3) if len(latencies) else None,
+            'batches': self.batches,
+            'mean_batch_size': round(self.batched_requests / self.batches, 2) if self.batches else None,
+        }
+
+
+class RecommendationService:
+    def __init__(self, matrix=None, window_ms=2.0, max_batch=256, top=10, mcc_version='v1', cache=None,
+                 catalog_check=5.0, net_value=False):
+        """
+        Parameters:
+        matrix (RewardMatrix, optional): Cards to rank, card_database from the catalog
+            (reloaded when cardCatalog.json changes) if None
+        window_ms (float): How long the batcher waits for more requests after the first
+        max_batch (int): Most requests ranked in one call
+        top (int): Cards returned when a request does not say
+        mcc_version (str): Version of the MCC mapping file used for transaction batches
+        cache (RankingCache, optional): Rankings by quantized profile, every request is
+            ranked exactly if None
+        catalog_check (float): Seconds between checks of cardCatalog.json for changes
+        net_value (bool): Rank by rewards minus annual fees when a request does not say
+        """
+        self.catalog_check = catalog_check
+        self._catalog_mtime = None
+        self._next_catalog_check = 0.0
+        if matrix is None:
+            self._catalog_mtime = os.path.getmtime(CATALOG_SOURCE)
+            matrix = RewardMatrix()
+        self.matrix = matrix
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.top = top
+        self.net_value = net_value
+        self.lookup = getLookup(mcc_version)
+        self.cache = cache
+        self.stats = ServiceStats()
+        self.queue = None
+        self._batcher = None
+
+    def spend_vector(self, payload):
+        """
+        Turn a /rank request body into a spend vector in RewardMatrix category order.
+        """
+        n_categories = len(self.matrix.categories)
+        if 'spend' in payload:
+            spend = payload['spend']
+            if not isinstance(spend, dict):
+                raise RequestError(400, "'spend' must map categories to amounts")
+            unknown = [category for category in spend if category not in self.matrix.category_index]
+            if unknown:
+                raise RequestError(400, "unknown categories: %s" % ', '.join(map(str, unknown)))
+            vector = np.zeros(n_categories)
+            for category, amount in spend.items():
+                if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not np.isfinite(amount):
+                    raise RequestError(400, "spend for %r must be a number, got %r" % (category, amount))
+                if amount < 0:
+                    raise RequestError(400, "spend for %r must not be negative, got %r" % (category, amount))
+                vector[self.matrix.category_index[category]] += amount
+            return vector
+        if 'transactions' in payload:
+            transactions = payload['transactions']
+            try:
+                amounts = np.array([t['Amount'] for t in transactions], dtype=np.float64)
+                mcc = np.array([t['MCC'] for t in transactions], dtype=np.float64)
+            except (KeyError, TypeError, ValueError):
+                raise RequestError(400, "'transactions' must be a list of objects with Amount and MCC") from None
+            if not (np.isfinite(amounts).all() and np.isfinite(mcc).all()):
+                raise RequestError(400, "transaction Amount and MCC must be numbers")
+            if (amounts < 0).any():
+                raise RequestError(400, "transaction Amount must not be negative")
+            return np.bincount(self.lookup.categorize(mcc), weights=amounts, minlength=n_categories)
+        raise RequestError(400, "body needs 'spend' or 'transactions'")
+
+    def refresh_matrix(self):
+        """
+        Reload the catalog if cardCatalog.json changed since it was loaded, checking the
+        file at most every catalog_check seconds. Only for a matrix the service built.
+        """
+        if self._catalog_mtime is None or time.monotonic() < self._next_catalog_check:
+            return
+        self._next_catalog_check = time.monotonic() + self.catalog_check
+        try:
+            mtime = os.path.getmtime(CATALOG_SOURCE)
+            if mtime == self._catalog_mtime:
+                return
+            matrix = RewardMatrix(loadCatalog().database())
+        except Exception as e:
+            # mid atomic save, a half-saved or an invalid edit: keep ranking with the catalog
+            # already loaded and try again at the next check
+            print("catalog reload failed, keeping the loaded catalog: %r" % e)
+            return
+        self._catalog_mtime = mtime
+        if matrix.fingerprint != self.matrix.fingerprint:
+            self.matrix = matrix
+            print("reloaded catalog, ranking %d cards" % len(matrix))
+
+    async def rank(self, spend, top, net_value=False):
+        """
+        Queue one spend vector for the next batch and wait for its ranking. The spend
+        vector must be in self.matrix's category order.
+        """
+        matrix = self.matrix
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((spend, top, matrix, net_value, future))
+        return await future
+
+    def _cards(self, matrix, order, values):
+        return [{'card': matrix.card_names[card], 'value': round(float(value), 2)}
+                for card, value in zip(order, values)]
+
+    async def _run_batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats.record_batch(len(batch))
+            # requests queued on both sides of a catalog reload are ranked with the matrix
+            # their spend vector was built for, gross and net value rankings apart
+            groups = {}
+            for item in batch:
+                groups.setdefault((id(item[2]), item[3]), []).append(item)
+            for items in groups.values():
+                try:
+                    await self._rank_batch(loop, items[0][2], items[0][3], items)
+                except Exception as e:
+                    # fail the batch's requests, not the batcher every later request waits on
+                    for *_, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+
+    async def _rank_batch(self, loop, matrix, net_value, batch):
+        spend = np.vstack([item[0] for item in batch])
+        fees = getBenefits().for_matrix(matrix)[0] if net_value else None
+        top = max(item[1] for item in batch)
+        try:
+            # off the event loop so connections keep being accepted while ranking
+            if self.cache is None:
+                order, values = await loop.run_in_executor(None, rankProfiles, matrix, spend, top, fees)
+            else:
+                order, values = await loop.run_in_executor(None, rankCached, matrix, spend, self.cache, top, fees)
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for row, (_, row_top, _, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(self._cards(matrix, order[row, :row_top], values[row, :row_top]))
+
+    async def _respond(self, writer, status, response, keep_alive):
+        data = json.dumps(response).encode()
+        writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n'
+                     b'Connection: %s\r\n\r\n' % (status, STATUS_TEXT[status].encode(), len(data),
+                                                   b'keep-alive' if keep_alive else b'close') + data)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except RequestError as e:
+                    # the body was not read, so the connection cannot be reused
+                    self.stats.errors += 1
+                    await self._respond(writer, e.status, {'error': str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                start = time.perf_counter()
+                try:
+                    status, response = 200, await self._route(method, path, body)
+                except RequestError as e:
+                    self.stats.errors += 1
+                    status, response = e.status, {'error': str(e)}
+                except Exception as e:
+                    # a bug or a failed ranking still gets an answer instead of a dropped connection
+                    self.stats.errors += 1
+                    print("error answering %s %s: %r" % (method, path, e))
+                    status, response = 500, {'error': 'internal error'}
+                if path == '/rank' and status == 200:
+                    self.stats.record(time.perf_counter() - start)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        # minimal HTTP/1.1: request line, headers, Content-Length body
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, version = line.decode('latin-1').split()
+        except ValueError:
+            raise ConnectionError("malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise RequestError(400, "invalid Content-Length") from None
+        if length < 0:
+            raise RequestError(400, "invalid Content-Length")
+        if length > MAX_BODY:
+            raise RequestError(413, "request body over %d bytes" % MAX_BODY)
+        body = await reader.readexactly(length) if length else b''
+        keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+        return method, path.split('?')[0], body, keep_alive
+
+    async def _route(self, method, path, body):
+        if path == '/stats':
+            report = self.stats.report()
+            if self.cache is not None:
+                report['cache'] = self.cache.stats()
+            return report
+        if path != '/rank':
+            raise RequestError(404, "unknown path %s" % path)
+        if method != 'POST':
+            raise RequestError(405, "use POST /rank")
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise RequestError(400, "body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise RequestError(400, "body must be a JSON object")
+        top = payload.get('top', self.top)
+        if isinstance(top, bool) or not isinstance(top, int) or top < 1:
+            raise RequestError(400, "'top' must be a positive integer")
+        net_value = payload.get('net_value', self.net_value)
+        if not isinstance(net_value, bool):
+            raise RequestError(400, "'net_value' must be true or false")
+        self.refresh_matrix()
+        return {'cards': await self.rank(self.spend_vector(payload), min(top, len(self.matrix)), net_value)}
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """
+        Start the batcher and listen, returns the asyncio server.
+        """
+        self.queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batcher())
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(host, port, **kwargs):
+    service = RecommendationService(**kwargs)
+    server = await service.start(host, port)
+    print("ranking %d cards on http://%s:%d/rank" % (len(service.matrix), host, port))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(json.dumps(service.stats.report()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--cache', action='store_true',
+                        help="serve profiles from a RankingCache of $10 spend buckets (approximate order)")
+    parser.add_argument('--catalog-check', type=float, default=5.0,
+                        help="seconds between checks of cardCatalog.json for changes")
+    parser.add_argument('--net-value', action='store_true',
+                        help="rank by a year of rewards minus annual fee unless a request says otherwise")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, window_ms=args.window_ms, max_batch=args.max_batch, top=args.top,
+                          cache=RankingCache() if args.cache else None, catalog_check=args.catalog_check,
+                          net_value=args.net_value))
+    except KeyboardInterrupt:
+        pass
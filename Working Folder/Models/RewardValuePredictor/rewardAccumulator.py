@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from mccCategories import getLookup
+from rewardMatrix import RewardMatrix
+from spendProfile import aggregateSpend
+
+
+class RewardAccumulator:
+    """
+    Running est reward value per (User, Card, candidate credit card), persisted between runs.
+
+    Transaction csvs are treated as append-only ledgers: the store remembers a byte offset
+    watermark per source file and ingest() only parses the rows written after it, so a
+    nightly update costs O(new rows) instead of re-reading the whole history. A last line
+    without a newline is ingested when it has every header field, and remembered, so a
+    later run that finds it was still being written takes it back out first.
+
+    keys[i] is the (User, Card) pair of row i and totals[i, c] is that pair's est reward
+    value on candidate card c (in card_names order). Saved as a single compressed .npz.
+    """
+
+    def __init__(self, matrix=None, mcc_version='v1'):
+        self.matrix = RewardMatrix() if matrix is None else matrix
+        self.card_names = list(self.matrix.card_names)
+        self.rates_fingerprint = self.matrix.fingerprint
+        self.mcc_version = mcc_version
+        self.keys = np.empty((0, 2), dtype=np.int64)
+        self.totals = np.empty((0, len(self.card_names)), dtype=np.float64)
+        self.transaction_counts = np.empty(0, dtype=np.int64)
+        self.watermarks = {}  # abs csv path -> {'offset': bytes ingested, 'header': header line}
+
+    @classmethod
+    def load(cls, path, matrix=None):
+        """
+        Load a saved store. The cards and rates it was built with must match matrix, since
+        totals columns are per card.
+
+        Parameters:
+        path (str): .npz file written by save()
+        matrix (RewardMatrix, optional): Card matrix to keep scoring with
+
+        Returns:
+        RewardAccumulator: The loaded store
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            store = cls(matrix, meta['mcc_version'])
+            if meta['card_names'] != store.card_names or meta['rates_fingerprint'] != store.rates_fingerprint:
+                raise ValueError("%s was built for a different card list or rates, rebuild it from scratch" % path)
+            store.keys = data['keys']
+            store.totals = data['totals']
+            store.transaction_counts = data['transaction_counts']
+        store.watermarks = meta['watermarks']
+        return store
+
+    def save(self, path):
+        meta = {
+            'card_names': self.card_names,
+            'rates_fingerprint': self.rates_fingerprint,
+            'mcc_version': self.mcc_version,
+            'watermarks': self.watermarks,
+        }
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, meta=np.array(json.dumps(meta)), keys=self.keys,
+                            totals=self.totals, transaction_counts=self.transaction_counts)
+        os.replace(tmp_path, path)  # never leave a half written store behind
+
+    def _read_new(self, csv_path):
+        """
+        Rows written after the watermark, and the row to take back out if the last run
+        ingested an unterminated last line that has been written to since.
+
+        Returns:
+        tuple: (pd.DataFrame of new rows or None, pd.DataFrame of the retracted row or None)
+        """
+        source = os.path.abspath(csv_path)
+        mark = self.watermarks.get(source)
+        with open(source, 'rb') as f:
+            header = f.readline()
+            if mark is None:
+                mark = {'offset': f.tell(), 'header': header.decode()}
+            elif header.decode() != mark['header']:
+                raise ValueError("%s header changed since it was last ingested" % csv_path)
+            size = os.fstat(f.fileno()).st_size
+            if size < mark['offset']:
+                raise ValueError("%s shrank since it was last ingested, rebuild the store" % csv_path)
+            tail = mark.get('tail', '').encode('latin-1')
+            start = mark['offset'] - len(tail)
+            f.seek(start)
+            data = f.read()
+
+        retracted = b''
+        if tail:
+            if not data.startswith(tail):
+                raise ValueError("%s changed before its last ingested row, rebuild the store" % csv_path)
+            if data[len(tail):len(tail) + 1] not in (b'', b'\n', b'\r'):
+                retracted = tail  # the line was still being written, take it back and re-read it whole
+            else:
+                start += len(tail)
+                data = data[len(tail):]
+
+        complete = data.rfind(b'\n') + 1
+        rest = data[complete:]
+        if rest.strip() and self._field_count(rest) == self._field_count(header):
+            end = len(data)  # a writer that never ends the file with a newline
+        else:
+            end = complete  # a row still being appended waits for the next run
+            if rest.strip():
+                warnings.warn("%s: last line has fewer fields than the header, left for the next run (%d bytes)"
+                              % (csv_path, len(rest)))
+        self.watermarks[source] = {'offset': start + end, 'header': mark['header']}
+        if end > complete:
+            self.watermarks[source]['tail'] = data[complete:end].decode('latin-1')
+
+        columns = ['User', 'Card', 'Amount', 'MCC']
+        new = pd.read_csv(io.BytesIO(header + data[:end]), usecols=columns) if end else None
+        old = pd.read_csv(io.BytesIO(header + retracted), usecols=columns) if retracted else None
+        return new, old
+
+    @staticmethod
+    def _field_count(line):
+        return len(next(csv.reader([line.decode('utf-8', 'replace').rstrip('\r\n')])))
+
+    def ingest(self, csv_path):
+        """
+        Score the rows appended to csv_path since the last ingest and add them to the totals.
+
+        Parameters:
+        csv_path (str): Preprocessed transactions csv with User, Card, Amount and MCC columns
+
+        Returns:
+        int: Number of new transactions ingested
+        """
+        df, retracted = self._read_new(csv_path)
+        if retracted is not None:
+            self._add(retracted.dropna(), -1)
+        if df is None:
+            return 0
+        df = df.dropna()
+        self._add(df)
+        return len(df)
+
+    def _add(self, df, sign=1):
+        # add (or with sign=-1 take back) the rewards of scored rows
+        if df.empty:
+            return
+        category_ids = getLookup(self.mcc_version).categorize(df['MCC'].to_numpy())
+        # (User, Card) spend profiles, then every candidate card in one matrix product
+        keys, spend, new_counts = aggregateSpend([df['User'].to_numpy(dtype=np.int64), df['Card'].to_numpy(dtype=np.int64)],
+                                                 df['Amount'].to_numpy(), category_ids, len(self.matrix.categories),
+                                                 return_counts=True)
+        pairs = np.array(keys.tolist(), dtype=np.int64).reshape(len(keys), 2)
+        new_totals = self.matrix.score_profiles(spend)
+
+        rows = self._rows_for(pairs)
+        self.totals[rows] += sign * new_totals
+        self.transaction_counts[rows] += sign * new_counts
+
+    def _rows_for(self, pairs):
+        # rows of existing (User, Card) keys, appending rows for keys never seen before
+        index = {tuple(key): i for i, key in enumerate(self.keys.tolist())}
+        rows = np.array([index.get(tuple(pair), -1) for pair in pairs.tolist()], dtype=np.int64)
+        missing = rows < 0
+        if missing.any():
+            rows[missing] = np.arange(len(self.keys), len(self.keys) + missing.sum())
+            self.keys = np.vstack([self.keys, pairs[missing]])
+            self.totals = np.vstack([self.totals, np.zeros((missing.sum(), self.totals.shape[1]))])
+            self.transaction_counts = np.concatenate([self.transaction_counts, np.zeros(missing.sum(), dtype=np.int64)])
+        return rows
+
+    def user_totals(self, user):
+        """
+        Est reward value per candidate card for one user, summed over their cards.
+        """
+        return self.totals[self.keys[:, 0] == user].sum(axis=0)
@@ -0,0 +1,147 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from creditCardValueCalc import card_database, creditCardCategories
+
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+
+class RewardMatrix:
+    """
+    Every card in a card list compiled into dense NumPy arrays so a whole array of
+    transactions can be scored against every card in one operation instead of calling
+    CreditCard.calculate_reward once per (card, transaction).
+
+    rates[c, k] is the dollars of reward card c earns per dollar spent on category k (its
+    'default' rate when the card does not list k), already normalized across points and
+    cashback units by the catalog compile step, so a transaction's dollar value is a
+    single amount * rates[c, k], the same arithmetic calculate_reward does.
+    """
+
+    def __init__(self, cards=None, categories=None):
+        if cards is None:
+            cards = card_database
+        self.cards = list(cards)
+        self.card_names = [card.name for card in self.cards]
+
+        # creditCardCategories first so ids are stable, then anything a card is keyed by
+        # that the list does not know about yet
+        self.categories = list(creditCardCategories if categories is None else categories)
+        self.category_index = {category: i for i, category in enumerate(self.categories)}
+        for card in self.cards:
+            for category in card.reward_structure:
+                if category != 'point_cashback' and category not in self.category_index:
+                    self.category_index[category] = len(self.categories)
+                    self.categories.append(category)
+
+        self.rates = np.array(
+            [[card.effective_rate(category) for category in self.categories] for card in self.cards],
+            dtype=np.float64
+        ).reshape(len(self.cards), len(self.categories))
+
+        # identifies the compiled rates, anything derived from them can check it still applies
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(repr((self.card_names, self.categories)).encode())
+        digest.update(self.rates.tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    def __len__(self):
+        return len(self.cards)
+
+    def category_ids(self, categories):
+        """
+        Convert transaction categories into column indexes of rates.
+
+        Parameters:
+        categories (array-like): Integer category ids, or category strings. Unknown
+            strings and missing values map to 'default' (id 0)
+
+        Returns:
+        np.ndarray: int64 category ids, one per transaction
+        """
+        categories = np.asarray(categories)
+        if categories.dtype.kind in 'iu':
+            ids = categories.astype(np.int64, copy=False)
+            if ids.size and (ids.min() < 0 or ids.max() >= len(self.categories)):
+                raise ValueError("category id out of range 0..%d" % (len(self.categories) - 1))
+            return ids
+
+        # only the distinct strings go through the dict, the rest is array indexing
+        codes, uniques = pd.factorize(categories)
+        lookup = np.array([self.category_index.get(category, 0) for category in uniques] + [0], dtype=np.int64)
+        return lookup[codes]  # factorize marks missing values -1, which picks the trailing 0
+
+    def score(self, amounts, categories, out=None):
+        """
+        Dollar value of every transaction on every card.
+
+        Parameters:
+        amounts (array-like): Transaction amounts in dollars
+        categories (array-like): Category ids or strings, same length as amounts
+        out (np.ndarray, optional): float64 buffer of shape (cards, transactions) to fill
+
+        Returns:
+        np.ndarray: cards x transactions matrix of reward values
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        ids = self.category_ids(categories)
+        if amounts.shape != ids.shape:
+            raise ValueError("amounts and categories must have the same length")
+
+        out = np.take(self.rates, ids, axis=1, out=out)
+        out *= amounts
+        return out
+
+    def totals(self, amounts, categories, chunk_size=65536):
+        """
+        Total reward value per card, scored chunk by chunk so the full cards x
+        transactions matrix never has to exist at once.
+
+        Parameters:
+        amounts (array-like): Transaction amounts in dollars
+        categories (array-like): Category ids or strings, same length as amounts
+        chunk_size (int): Transactions scored per matrix operation
+
+        Returns:
+        np.ndarray: Reward value per card, in card order
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        with stage('score', len(amounts)):
+            ids = self.category_ids(categories)
+            totals = np.zeros(len(self.cards), dtype=np.float64)
+            buffer = np.empty((len(self.cards), min(chunk_size, len(amounts))), dtype=np.float64)
+            for start in range(0, len(amounts), chunk_size):
+                stop = min(start + chunk_size, len(amounts))
+                chunk = self.score(amounts[start:stop], ids[start:stop], out=buffer[:, :stop - start])
+                totals += chunk.sum(axis=1)
+        return totals
+
+    def score_profiles(self, spend):
+        """
+        Reward value of spend profiles on every card.
+
+        Parameters:
+        spend (np.ndarray): Spend per category, one vector or a profiles x categories matrix
+            (see spendProfile.py)
+
+        Returns:
+        np.ndarray: Reward value per card, or a profiles x cards matrix
+        """
+        return np.asarray(spend, dtype=np.float64) @ self.rates.T
+
+    def rank(self, totals):
+        """
+        Order per-card totals from best to worst.
+
+        Parameters:
+        totals (np.ndarray): Reward value per card, as returned by totals()
+
+        Returns:
+        list: (card name, reward value) tuples, highest value first
+        """
+        with stage('rank', len(totals)):
+            order = np.argsort(-totals, kind='stable')
+            return [(self.card_names[i], float(totals[i])) for i in order]
@@ -0,0 +1,143 @@
+"""
+Quarterly rotating category rates as a card x category x quarter table.
+
+'Quarterly Rotating Categories' is a rate, not a category any transaction is in, so with a
+flat RewardMatrix rotating cards only ever earn their default rate. rotatingCategories_<version>.csv
+is the calendar of which categories rotate in each quarter:
+
+    Card       catalog id of the card
+    Year       calendar year the row belongs to
+    Quarter    1-4
+    Category   category earning the rotating rate that quarter
+    Rate       dollars of reward per dollar spent, blank for the card's own
+               'Quarterly Rotating Categories' rate
+
+RotatingRates copies RewardMatrix.rates into four quarter slices and raises the
+calendar's categories in theirs, so a transaction is scored with one lookup on
+(category, quarter of its Month) and rotating cards go through the same batch pass as
+every other card.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cardCatalog import getCatalog
+
+ROTATING_CATEGORIES_VERSION = 'v1'
+ROTATING_RULE = 'Quarterly Rotating Categories'
+CALENDAR_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def loadRotatingCalendar(version=ROTATING_CATEGORIES_VERSION, path=None):
+    """
+    Read and check a rotating categories calendar.
+
+    Returns:
+    pd.DataFrame: One row per (card, year, quarter, category)
+    """
+    path = os.path.join(CALENDAR_DIR, 'rotatingCategories_%s.csv' % version) if path is None else path
+    calendar = pd.read_csv(path, dtype={'Card': str, 'Year': np.int64, 'Quarter': np.int64, 'Category': str,
+                                        'Rate': np.float64})
+    catalog = getCatalog()
+    for row in calendar.to_dict('records'):
+        if row['Card'] not in catalog:
+            raise ValueError("%s: unknown card %r" % (path, row['Card']))
+        if not 1 <= row['Quarter'] <= 4:
+            raise ValueError("%s: %r has quarter %d, expected 1-4" % (path, row['Card'], row['Quarter']))
+        if np.isnan(row['Rate']) and ROTATING_RULE not in catalog.get(row['Card']).reward_structure:
+            raise ValueError("%s: %r has no %r rate, give a Rate" % (path, row['Card'], ROTATING_RULE))
+    return calendar
+
+
+class RotatingRates:
+    def __init__(self, matrix, calendar=None, year=None):
+        """
+        Parameters:
+        matrix (RewardMatrix): Cards to score
+        calendar (pd.DataFrame, optional): From loadRotatingCalendar(), the default version if None
+        year (int, optional): Calendar year to use, the latest in the calendar if None
+        """
+        self.matrix = matrix
+        calendar = loadRotatingCalendar() if calendar is None else calendar
+        self.year = int(calendar['Year'].max()) if year is None else year
+        calendar = calendar[calendar['Year'] == self.year]
+
+        catalog = getCatalog()
+        # rates[c, k, q]: rate of card c on category k in quarter q (0-3)
+        self.rates = np.repeat(matrix.rates[:, :, np.newaxis], 4, axis=2)
+        self.rotating = {}  # card index -> quarter x categories bool, categories in rotation
+        for row in calendar.to_dict('records'):
+            name = catalog.get(row['Card']).name
+            category = matrix.category_index.get(row['Category'])
+            if category is None:
+                raise ValueError("category %r of %r is not a RewardMatrix category" % (row['Category'], row['Card']))
+            for card in (i for i, card_name in enumerate(matrix.card_names) if card_name == name):
+                rate = row['Rate']
+                if np.isnan(rate):
+                    rate = matrix.rates[card, matrix.category_index[ROTATING_RULE]]
+                quarter = row['Quarter'] - 1
+                self.rates[card, category, quarter] = max(self.rates[card, category, quarter], rate)
+                self.rotating.setdefault(card, np.zeros((4, len(matrix.categories)), dtype=bool))[quarter, category] = True
+
+        # (category, quarter) flattened into one column index, so scoring is a single take
+        self._flat_rates = self.rates.reshape(len(matrix), -1)
+
+    def _columns(self, categories, months):
+        ids = self.matrix.category_ids(categories)
+        months = np.asarray(months, dtype=np.int64)
+        if ids.shape != months.shape:
+            raise ValueError("categories and months must have the same length")
+        if months.size and (months.min() < 1 or months.max() > 12):
+            raise ValueError("months must be 1-12")
+        return ids, ids * 4 + (months - 1) // 3
+
+    def score(self, amounts, categories, months, out=None):
+        """
+        Dollar value of every transaction on every card, rotating categories included.
+
+        Parameters:
+        amounts (array-like): Transaction amounts in dollars
+        categories (array-like): Category ids or strings, same length as amounts
+        months (array-like): Month (1-12) of each transaction, the Month column of the v3 csv
+        out (np.ndarray, optional): float64 buffer of shape (cards, transactions) to fill
+
+        Returns:
+        np.ndarray: cards x transactions matrix of reward values
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        _, columns = self._columns(categories, months)
+        if amounts.shape != columns.shape:
+            raise ValueError("amounts and categories must have the same length")
+
+        out = np.take(self._flat_rates, columns, axis=1, out=out)
+        out *= amounts
+        return out
+
+    def totals(self, amounts, categories, months, chunk_size=65536):
+        """
+        Total reward value per card, scored chunk by chunk like RewardMatrix.totals().
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        ids, _ = self._columns(categories, months)
+        months = np.asarray(months, dtype=np.int64)
+        totals = np.zeros(len(self.matrix), dtype=np.float64)
+        buffer = np.empty((len(self.matrix), min(chunk_size, len(amounts))), dtype=np.float64)
+        for start in range(0, len(amounts), chunk_size):
+            stop = min(start + chunk_size, len(amounts))
+            chunk = self.score(amounts[start:stop], ids[start:stop], months[start:stop],
+                               out=buffer[:, :stop - start])
+            totals += chunk.sum(axis=1)
+        return totals
+
+    def eligible(self, categories, months):
+        """
+        Transactions in each rotating card's current categories, the eligibility masks
+        CapEngine takes to apply the quarterly cap on rotating rates.
+
+        Returns:
+        dict: card index -> bool mask over transactions
+        """
+        ids, _ = self._columns(categories, months)
+        quarters = (np.asarray(months, dtype=np.int64) - 1) // 3
+        return {card: in_rotation[quarters, ids] for card, in_rotation in self.rotating.items()}
@@ -0,0 +1,229 @@
+"""
+Cap-aware and tiered reward evaluation.
+
+Some catalog categories are conditions on spend rather than places to spend, e.g.
+'First $50000 Spent Annually' or 'Purchases over $5000', and rotating / chosen category
+bonuses stop after a quarterly cap. spendCaps_<version>.csv describes them, one rule per
+card:
+
+    Card         catalog id of the card
+    Rule Category  the reward_structure key holding the bonus rate; for
+                 'Quarterly Rotating Categories' the rate of each quarter's categories
+                 comes from the rotating calendar (rotatingRates.py) when CapEngine has one,
+                 so cards whose calendar rows give their own Rate need no such key
+    Applies To   '*' for every purchase, or the category a transaction must be in
+    Period       'year', 'quarter' or 'month' the cap resets on (blank: no cap)
+    Cap          dollars per period earning the bonus rate
+    Min Amount   only single purchases of at least this amount earn the bonus rate
+
+CapEngine walks each user's transactions in time order with cumulative sums per
+(user, period) to split every eligible transaction into its in-cap and over-cap parts,
+so capped cards are valued without a Python loop per transaction. The in-cap part earns
+the rule's rate, everything else the card's normal rate.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cardCatalog import getCatalog
+from rotatingRates import ROTATING_RULE
+
+SPEND_CAPS_VERSION = 'v1'
+RULES_DIR = os.path.dirname(os.path.abspath(__file__))
+PERIODS = ('year', 'quarter', 'month')
+
+
+def loadSpendCaps(version=SPEND_CAPS_VERSION, path=None):
+    """
+    Read and check a spend cap rules file.
+
+    Returns:
+    pd.DataFrame: One row per rule
+    """
+    path = os.path.join(RULES_DIR, 'spendCaps_%s.csv' % version) if path is None else path
+    rules = pd.read_csv(path, dtype={'Card': str, 'Rule Category': str, 'Applies To': str, 'Period': str})
+    catalog = getCatalog()
+    for rule in rules.to_dict('records'):
+        if rule['Card'] not in catalog:
+            raise ValueError("%s: unknown card %r" % (path, rule['Card']))
+        if rule['Rule Category'] != ROTATING_RULE and rule['Rule Category'] not in catalog.get(rule['Card']).reward_structure:
+            raise ValueError("%s: %r has no %r rate" % (path, rule['Card'], rule['Rule Category']))
+        capped = isinstance(rule['Period'], str)
+        if capped and (rule['Period'] not in PERIODS or not rule['Cap'] > 0):
+            raise ValueError("%s: %r needs a Period in %s and a positive Cap" % (path, rule['Card'], PERIODS))
+        if not capped and not rule['Min Amount'] > 0:
+            raise ValueError("%s: %r needs either a Period and Cap or a Min Amount" % (path, rule['Card']))
+    return rules
+
+
+def periodKey(period, years, months):
+    """
+    Index of the year, quarter or month each transaction falls in.
+    """
+    if period == 'year':
+        return years
+    if period == 'quarter':
+        return years * 4 + (months - 1) // 3
+    return years * 12 + (months - 1)
+
+
+def _capSplit(amounts, groups):
+    """
+    In-cap share calculation helper: running total of amounts within runs of equal groups
+    (rows already in time order), excluding the current row.
+    """
+    cum = np.cumsum(amounts)
+    run_start = np.ones(len(groups), dtype=bool)
+    run_start[1:] = groups[1:] != groups[:-1]
+    first = np.maximum.accumulate(np.where(run_start, np.arange(len(groups)), 0))
+    return cum - amounts - (cum[first] - amounts[first])
+
+
+class CapEngine:
+    def __init__(self, matrix, rules=None, rotating=None, dynamic=None):
+        """
+        Parameters:
+        matrix (RewardMatrix): Cards to score
+        rules (pd.DataFrame, optional): From loadSpendCaps(), the default version if None
+        rotating (RotatingRates, optional): Scores uncapped cards by quarter and supplies
+            the eligibility of rotating category rules
+        dynamic (DynamicCategories, optional): Supplies the eligibility of top category and
+            category of choice rules
+        """
+        self.matrix = matrix
+        self.rotating = rotating
+        self.dynamic = dynamic
+        rules = loadSpendCaps() if rules is None else rules
+        catalog = getCatalog()
+        self.rules = []
+        for rule in rules.to_dict('records'):
+            name = catalog.get(rule['Card']).name
+            # rules of cards the matrix does not hold are skipped
+            for card in (i for i, card_name in enumerate(matrix.card_names) if card_name == name):
+                self.rules.append({
+                    'card': card,
+                    'rate': matrix.rates[card, matrix.category_index[rule['Rule Category']]]
+                    if rule['Rule Category'] in matrix.category_index else None,
+                    'rotating': rule['Rule Category'] == ROTATING_RULE,
+                    'applies_to': None if rule['Applies To'] == '*' else matrix.category_index.get(rule['Applies To'], -1),
+                    'period': rule['Period'] if isinstance(rule['Period'], str) else None,
+                    'cap': rule['Cap'],
+                    'min_amount': rule['Min Amount'] if rule['Min Amount'] > 0 else None,
+                })
+
+    def _capped_rows(self, users, years, months, order_key, amounts, category_ids, eligible):
+        # reward values of the capped cards only: {card index: values in input row order}
+        # every (user, period) becomes one contiguous run in time order
+        order = np.lexsort((order_key, months, years, users))
+        amounts_sorted = amounts[order]
+        ids_sorted = category_ids[order]
+        rows = {}
+        for rule in self.rules:
+            card = rule['card']
+            base = self.matrix.rates[card, ids_sorted] * amounts_sorted
+            if card in eligible:
+                mask = np.asarray(eligible[card], dtype=bool)[order]
+            elif rule['applies_to'] is None:
+                mask = np.ones(len(amounts), dtype=bool)
+            else:
+                mask = ids_sorted == rule['applies_to']
+            if rule['min_amount'] is not None:
+                mask &= amounts_sorted >= rule['min_amount']
+
+            if rule['period'] is None:
+                bonus = np.where(mask, amounts_sorted, 0.0)
+            else:
+                eligible_amounts = np.where(mask, amounts_sorted, 0.0)
+                groups = users[order].astype(np.int64) * 100000 + periodKey(rule['period'], years[order], months[order])
+                prior = _capSplit(eligible_amounts, groups)
+                bonus = np.clip(rule['cap'] - prior, 0.0, eligible_amounts)
+            if rule['rotating'] and self.rotating is not None:
+                # each quarter's rotating rate from the calendar, over the cap the normal rate
+                rate = self.rotating.rates[card, ids_sorted, (months[order] - 1) // 3]
+            elif rule['rate'] is None:
+                continue  # a rotating rule without a calendar has no bonus rate to apply
+            else:
+                rate = rule['rate']
+            # the bonus part earns the rule rate instead of the normal one
+            values = base + bonus * (rate - self.matrix.rates[card, ids_sorted])
+            unsorted = np.empty_like(values)
+            unsorted[order] = values
+            rows[card] = unsorted
+        return rows
+
+    def score(self, users, months, amounts, categories, order_key=None, years=None, eligible=None):
+        """
+        Reward value of every transaction on every card with caps and tiers applied.
+
+        Parameters:
+        users (array-like): User per transaction, caps are tracked per user
+        months (array-like): Month (1-12) per transaction
+        amounts (array-like): Transaction amounts in dollars
+        categories (array-like): Category ids or strings
+        order_key (array-like, optional): Sorts a user's transactions of one month in time
+            (e.g. timeOrderKey(df)), rows are taken as already in time order if None
+        years (array-like, optional): Year per transaction, one year assumed if None
+        eligible (dict, optional): card index -> bool mask of transactions its rule applies
+            to, overriding 'Applies To' (used for rotating / chosen categories)
+
+        Returns:
+        np.ndarray: cards x transactions reward values
+        """
+        users, months, amounts, ids, order_key, years = self._arrays(users, months, amounts, categories,
+                                                                     order_key, years)
+        if self.rotating is None:
+            values = self.matrix.score(amounts, ids)
+        else:
+            values = self.rotating.score(amounts, ids, months)
+        eligible = self._eligible(users, years, months, amounts, ids, eligible)
+        for card, row in self._capped_rows(users, years, months, order_key, amounts, ids, eligible).items():
+            values[card] = row
+        return values
+
+    def totals(self, users, months, amounts, categories, order_key=None, years=None, eligible=None):
+        """
+        Reward value per card with caps and tiers applied, without building the full
+        cards x transactions matrix. Same parameters as score().
+        """
+        users, months, amounts, ids, order_key, years = self._arrays(users, months, amounts, categories,
+                                                                     order_key, years)
+        if self.rotating is None:
+            totals = self.matrix.totals(amounts, ids)
+        else:
+            totals = self.rotating.totals(amounts, ids, months)
+        eligible = self._eligible(users, years, months, amounts, ids, eligible)
+        for card, row in self._capped_rows(users, years, months, order_key, amounts, ids, eligible).items():
+            totals[card] = row.sum()
+        return totals
+
+    def _eligible(self, users, years, months, amounts, ids, eligible):
+        # explicit masks win over the rotating calendar's and the dynamic rules'
+        masks = {}
+        if self.rotating is not None:
+            masks.update(self.rotating.eligible(ids, months))
+        if self.dynamic is not None:
+            masks.update(self.dynamic.eligible(users, months, amounts, ids, years))
+        masks.update(eligible or {})
+        return masks
+
+    def _arrays(self, users, months, amounts, categories, order_key, years):
+        amounts = np.asarray(amounts, dtype=np.float64)
+        n = len(amounts)
+        users = np.asarray(users, dtype=np.int64)
+        months = np.asarray(months, dtype=np.int64)
+        ids = self.matrix.category_ids(categories)
+        order_key = np.arange(n) if order_key is None else np.asarray(order_key)
+        years = np.zeros(n, dtype=np.int64) if years is None else np.asarray(years, dtype=np.int64)
+        return users, months, amounts, ids, order_key, years
+
+
+def timeOrderKey(df):
+    """
+    Sort key putting a user's transactions of one year in time order, from the Month/Day/
+    Time columns of the preprocessed csvs.
+    """
+    key = df['Month'].to_numpy(dtype=np.int64) * 100 + df['Day'].to_numpy(dtype=np.int64)
+    if 'Time' in df.columns:
+        key = key * 10000 + df['Time'].to_numpy(dtype=np.int64)
+    return key
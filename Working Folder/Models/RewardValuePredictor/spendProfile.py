@@ -0,0 +1,110 @@
+"""
+Spend profiles: a ledger reduced to spend per reward category for each user (and period).
+
+With flat rates a card's value on a ledger only depends on how much was spent in each
+category, so once transactions are aggregated into a users x categories spend matrix,
+every card in card_database is ranked for every user with one matrix product against
+RewardMatrix.rates instead of scoring transactions x cards.
+"""
+
+import numpy as np
+import pandas as pd
+
+from mccCategories import getLookup
+
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+
+def aggregateSpend(keys, amounts, category_ids, n_categories, return_counts=False):
+    """
+    Sum amounts per (key, category) in a single pass.
+
+    Parameters:
+    keys (array-like or list of array-like): Group key per transaction, e.g. User, or
+        several columns such as [User, Month] for per-period profiles
+    amounts (array-like): Transaction amounts in dollars
+    category_ids (array-like): Category id per transaction (RewardMatrix column)
+    n_categories (int): Number of categories, len(RewardMatrix.categories)
+    return_counts (bool): Also return the number of transactions per key
+
+    Returns:
+    tuple: (unique keys, sorted, as an array or MultiIndex, keys x categories spend matrix
+            [, transactions per key])
+    """
+    if isinstance(keys, (list, tuple)):
+        group, unique_keys = pd.MultiIndex.from_arrays([np.asarray(k) for k in keys]).factorize(sort=True)
+    else:
+        group, unique_keys = pd.factorize(np.asarray(keys), sort=True)
+    category_ids = np.asarray(category_ids, dtype=np.int64)
+    spend = np.bincount(group * n_categories + category_ids, weights=np.asarray(amounts, dtype=np.float64),
+                        minlength=len(unique_keys) * n_categories)
+    spend = spend.reshape(len(unique_keys), n_categories)
+    if return_counts:
+        return unique_keys, spend, np.bincount(group, minlength=len(unique_keys))
+    return unique_keys, spend
+
+
+def spendProfiles(df, matrix, by=('User',), mcc_version='v1'):
+    """
+    Spend profiles from a transactions DataFrame with Amount and MCC columns.
+
+    Parameters:
+    df (pd.DataFrame): Transactions, rows with missing values in the used columns are skipped
+    matrix (RewardMatrix): Defines the category columns of the profiles
+    by (tuple): Columns to group by, e.g. ('User',) or ('User', 'Month') for monthly profiles
+    mcc_version (str): Version of the MCC mapping file to use
+
+    Returns:
+    tuple: (profile keys, profiles x categories spend matrix)
+    """
+    by = list(by)
+    df = df[by + ['Amount', 'MCC']].dropna()
+    category_ids = getLookup(mcc_version).categorize(df['MCC'].to_numpy())
+    keys = df[by[0]].to_numpy() if len(by) == 1 else [df[column].to_numpy() for column in by]
+    return aggregateSpend(keys, df['Amount'].to_numpy(), category_ids, len(matrix.categories))
+
+
+def rankProfiles(matrix, spend, top=None, annual_fees=None):
+    """
+    Rank every card for every spend profile.
+
+    Parameters:
+    matrix (RewardMatrix): Cards to rank
+    spend (np.ndarray): profiles x categories spend matrix
+    top (int, optional): Only return the best top cards per profile
+    annual_fees (np.ndarray, optional): Fee per card subtracted before ranking, e.g. from
+        cardBenefits.getBenefits().for_matrix(matrix), for net value on annual profiles
+
+    Returns:
+    tuple: (profiles x top card indexes into matrix.cards, best first,
+            profiles x top reward (or net) values in dollars)
+    """
+    with stage('score', len(spend)):
+        values = matrix.score_profiles(spend)
+        if annual_fees is not None:
+            values -= annual_fees
+    return rankValues(values, top)
+
+
+def rankValues(values, top=None):
+    """
+    Order the cards of every row of a profiles x cards value matrix, best first.
+
+    Parameters:
+    values (np.ndarray): profiles x cards reward (or net) values in dollars
+    top (int, optional): Only return the best top cards per profile
+
+    Returns:
+    tuple: (profiles x top card indexes, profiles x top values)
+    """
+    with stage('rank', len(values)):
+        n_cards = values.shape[1]
+        if top is None or top >= n_cards:
+            order = np.argsort(-values, axis=1, kind='stable')
+        else:
+            # partition out the top cards first so only those get sorted
+            candidates = np.argpartition(-values, top - 1, axis=1)[:, :top]
+            order = np.take_along_axis(candidates, np.argsort(-np.take_along_axis(values, candidates, axis=1),
+                                                              axis=1, kind='stable'), axis=1)
+        return order, np.take_along_axis(values, order, axis=1)
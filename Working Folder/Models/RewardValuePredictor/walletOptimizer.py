@@ -0,0 +1,169 @@
+"""
+Best wallet of up to k cards for a spend profile.
+
+A wallet earns, in every category, the best rate among its cards, so its yearly value is
+sum over categories of spend * max(card rates) minus the cards' annual fees. Instead of
+trying all C(n, k) combinations the search
+
+1. drops categories with no spend and cards dominated by another card (at least as
+   good in every spent category for no more fee), then
+2. runs a depth-first branch and bound over the remaining cards, best standalone card
+   first, pruning a branch when an upper bound on what it can still reach is no better
+   than the best wallet found: the smaller of the per-category max over the remaining
+   cards and the sum of the best individual marginal gains (valid because wallet value
+   is submodular in its cards).
+"""
+import time
+from itertools import combinations
+
+import numpy as np
+
+
+class WalletOptimizer:
+    def __init__(self, matrix, annual_fees=None):
+        """
+        Parameters:
+        matrix (RewardMatrix): Candidate cards, e.g. RewardMatrix(getCatalog().cards())
+        annual_fees (array-like, optional): Annual fee per card in matrix order, 0 if None
+        """
+        self.matrix = matrix
+        if annual_fees is None:
+            annual_fees = np.zeros(len(matrix))
+        self.annual_fees = np.asarray(annual_fees, dtype=np.float64)
+        if self.annual_fees.shape != (len(matrix),):
+            raise ValueError("annual_fees needs one fee per card (%d)" % len(matrix))
+
+    def _candidates(self, values):
+        # values: cards x spent categories, dollars earned per card. Keeps undominated cards
+        fees = self.annual_fees
+        keep = np.ones(len(values), dtype=bool)
+        for a in range(len(values)):
+            at_least = (values >= values[a]).all(axis=1) & (fees <= fees[a])
+            strictly = (values > values[a]).any(axis=1) | (fees < fees[a])
+            # ties (identical cards) keep the lowest index only
+            dominated = at_least & (strictly | (np.arange(len(values)) < a))
+            dominated[a] = False
+            if dominated.any():
+                keep[a] = False
+        return np.flatnonzero(keep)
+
+    def optimize(self, spend, k):
+        """
+        Find the best wallet of up to k cards.
+
+        Parameters:
+        spend (array-like): Spend per category (RewardMatrix category order), e.g. a
+            spendProfile row, usually a year of spend
+        k (int): Maximum number of cards in the wallet
+
+        Returns:
+        dict: 'cards' (names), 'card_ids' (matrix indexes), 'value' (rewards in dollars),
+            'fees', 'net_value', plus search stats 'candidates' and 'nodes'
+        """
+        spend = np.asarray(spend, dtype=np.float64)
+        spent = np.flatnonzero(spend > 0)
+        values = self.matrix.rates[:, spent] * spend[spent]
+        fees = self.annual_fees
+
+        candidates = self._candidates(values)
+        standalone = values[candidates].sum(axis=1) - fees[candidates]
+        candidates = candidates[np.argsort(-standalone, kind='stable')]
+        cand_values = values[candidates]
+        cand_fees = fees[candidates]
+        # suffix_max[i] = per-category best rate among candidates i.., bound 1
+        suffix_max = np.maximum.accumulate(cand_values[::-1], axis=0)[::-1]
+
+        best = {'net': 0.0, 'wallet': ()}
+        nodes = 0
+
+        def search(start, wallet, covered, fee_total, remaining):
+            nonlocal nodes
+            nodes += 1
+            net = covered.sum() - fee_total
+            if net > best['net']:
+                best['net'], best['wallet'] = net, wallet
+            if remaining == 0 or start == len(candidates):
+                return
+
+            gains = np.maximum(cand_values[start:], covered).sum(axis=1) - covered.sum() - cand_fees[start:]
+            positive = np.sort(gains[gains > 0])[::-1][:remaining]
+            bound = min(np.maximum(covered, suffix_max[start]).sum() - fee_total, net + positive.sum())
+            if bound <= best['net'] + 1e-9:
+                return
+
+            for offset in np.argsort(-gains, kind='stable'):
+                if gains[offset] <= 0:
+                    break
+                i = start + offset
+                # only candidates after i go deeper, so every wallet is visited once
+                search(i + 1, wallet + (i,), np.maximum(covered, cand_values[i]),
+                       fee_total + cand_fees[i], remaining - 1)
+
+        search(0, (), np.zeros(len(spent)), 0.0, k)
+
+        card_ids = [int(candidates[i]) for i in best['wallet']]
+        value = float(values[card_ids].max(axis=0).sum()) if card_ids else 0.0
+        return {
+            'cards': [self.matrix.card_names[i] for i in card_ids],
+            'card_ids': card_ids,
+            'value': value,
+            'fees': float(fees[card_ids].sum()),
+            'net_value': value - float(fees[card_ids].sum()),
+            'candidates': len(candidates),
+            'nodes': nodes,
+        }
+
+    def brute_force(self, spend, k):
+        """
+        Exhaustive search over every wallet of up to k cards, for checking optimize().
+        """
+        spend = np.asarray(spend, dtype=np.float64)
+        values = self.matrix.rates * spend
+        best_net, best_wallet = 0.0, ()
+        for size in range(1, k + 1):
+            for wallet in combinations(range(len(values)), size):
+                net = values[list(wallet)].max(axis=0).sum() - self.annual_fees[list(wallet)].sum()
+                if net > best_net + 1e-9:
+                    best_net, best_wallet = net, wallet
+        return best_net, best_wallet
+
+
+def benchmarkWallets(optimizer, spend, ks=(2, 3, 4)):
+    """
+    Time optimize() for several wallet sizes.
+
+    Returns:
+    list: (k, seconds, search nodes, C(cards, k), net value) per k
+    """
+    from math import comb
+
+    results = []
+    for k in ks:
+        start = time.perf_counter()
+        wallet = optimizer.optimize(spend, k)
+        results.append((k, time.perf_counter() - start, wallet['nodes'], comb(len(optimizer.matrix), k),
+                        wallet['net_value']))
+    return results
+
+
+if __name__ == '__main__':
+    import os
+
+    import pandas as pd
+
+    from cardBenefits import getBenefits
+    from cardCatalog import getCatalog
+    from rewardMatrix import RewardMatrix
+    from spendProfile import spendProfiles
+
+    matrix = RewardMatrix(getCatalog().cards())
+    fees, _, _ = getBenefits().for_matrix(matrix)
+    optimizer = WalletOptimizer(matrix, fees)
+
+    csv_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ccTransactions',
+                            'ccTransactions_prepocessed_v3.csv')
+    _, spend = spendProfiles(pd.read_csv(csv_data), matrix)
+    print("%d catalog cards" % len(matrix))
+    for k, seconds, nodes, combos, net in benchmarkWallets(optimizer, spend[0]):
+        print("k=%d  %.4fs  %d nodes searched vs %d combinations  net value $%.2f" % (k, seconds, nodes, combos, net))
+    print(optimizer.optimize(spend[0], 3)['cards'])
@@ -0,0 +1,230 @@
+"""
+Benchmarks for the reward engine, the card catalog and the clustering pipeline.
+
+    python rewardBenchmarks.py                          # 10k and 1m transactions
+    python rewardBenchmarks.py --sizes 10k,1m,10m --output results.json
+    python rewardBenchmarks.py --baseline baseline.json --threshold 0.25
+    python rewardBenchmarks.py --output baseline.json   # record a new baseline
+
+Every benchmark runs on synthetic transactions in the v3 csv layout (see
+ccTransactions/syntheticTransactions.py), generated from a fixed seed so runs are
+comparable, and reports the best of --repeat timings. Results go to a JSON file keyed
+'<benchmark>@<rows>'; with --baseline each result is compared to the stored one and
+anything slower by more than --threshold (a fraction) is reported as a regression, which
+also makes the script exit with status 1.
+
+CreditCard.calculate_reward is timed on at most --max-loop-rows calls, its rows/s is
+what matters. Catalog import does not depend on the data size and runs once, its rows
+are the catalog's card count. Benchmarks that change their input (scaling in place) get
+it rebuilt, untimed, before every repeat, so every result is a best of --repeat.
+
+The wide PCA benchmarks (one-hot MCC and geography, see dimensionReduction.py) time the
+exact dense solver against the randomized sparse one on the same --max-exact-rows rows,
+and a fit on a stratified sample of that many rows plus projecting the whole ledger.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(MODELS_DIR, 'RewardValuePredictor'))
+sys.path.insert(0, os.path.join(MODELS_DIR, 'ccTransactions'))
+
+from cardCatalog import CATALOG_SOURCE, compileCatalog, loadCatalog  # noqa: E402
+from creditCardValueCalc import card_database  # noqa: E402
+from dimensionReduction import WideFeatures, WidePCA  # noqa: E402
+from featureMatrix import FEATURE_COLUMNS, buildFeatureMatrix, scaleInPlace  # noqa: E402
+from mccCategories import getLookup  # noqa: E402
+from rewardMatrix import RewardMatrix  # noqa: E402
+from syntheticTransactions import TransactionGenerator  # noqa: E402
+from transactionStore import convertCsv, TransactionStore  # noqa: E402
+
+SIZES = {'10k': 10000, '1m': 1000000, '10m': 10000000}
+
+
+def syntheticTransactions(rows, seed=0):
+    """
+    Transactions in the v3 csv layout from the seeded generator in syntheticTransactions.py.
+    """
+    return pd.concat(TransactionGenerator().generate(rows, 'v3', seed), ignore_index=True)
+
+
+def timeIt(function, repeat, setup=None):
+    """
+    Best wall time of repeat calls of function, setup (untimed) run before each one.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def runBenchmarks(sizes, repeat=3, max_loop_rows=100000, seed=0, workdir=None, max_exact_rows=100000,
+                  wide_components=20):
+    """
+    Run every benchmark at every size.
+
+    Parameters:
+    sizes (list): Transaction counts
+    repeat (int): Timings per benchmark, the best is kept
+    max_loop_rows (int): Most calls timed for the per-transaction calculate_reward loop
+    seed (int): Seed of the synthetic data
+    max_exact_rows (int): Rows of the exact/randomized wide PCA comparison and of the sample
+    wide_components (int): Components of the wide PCA
+    workdir (str, optional): Where the synthetic csvs and stores go, a temporary directory if None
+
+    Returns:
+    dict: '<benchmark>@<rows>' -> {'benchmark', 'rows', 'seconds', 'rows_per_s'}
+    """
+    from sklearn.cluster import KMeans
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
+    results = {}
+
+    def record(name, rows, seconds):
+        results['%s@%d' % (name, rows)] = {
+            'benchmark': name,
+            'rows': rows,
+            'seconds': round(seconds, 6),
+            'rows_per_s': round(rows / seconds, 1) if seconds > 0 else None,
+        }
+        print("%-18s %10d rows  %10.4fs" % (name, rows, seconds))
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        index = os.path.join(tmp, 'cardCatalog.pkl')
+        n_cards = len(compileCatalog(CATALOG_SOURCE, index)['ids'])  # every catalog card, not just card_database
+        record('catalog_compile', n_cards, timeIt(lambda: compileCatalog(CATALOG_SOURCE, index), repeat))
+        record('catalog_load', n_cards, timeIt(lambda: loadCatalog(CATALOG_SOURCE, index), repeat))
+
+        matrix = RewardMatrix(card_database)
+        lookup = getLookup()
+        for rows in sizes:
+            df = syntheticTransactions(rows, seed)
+            amounts = df['Amount'].to_numpy(dtype=np.float64)
+            categories = lookup.categorize(df['MCC'].to_numpy())
+
+            loop_rows = min(rows, max_loop_rows)
+            card = card_database[0]
+            names = lookup.category_names(categories[:loop_rows]).tolist()
+            loop_amounts = amounts[:loop_rows].tolist()
+            record('calculate_reward', loop_rows, timeIt(
+                lambda: [card.calculate_reward(a, c) for a, c in zip(loop_amounts, names)], repeat))
+            record('catalog_ranking', rows, timeIt(lambda: matrix.rank(matrix.totals(amounts, categories)), repeat))
+
+            csv_path = os.path.join(tmp, 'transactions_%d.csv' % rows)
+            df.to_csv(csv_path, index=False)
+            del df
+            record('csv_load', rows, timeIt(lambda: pd.read_csv(csv_path), repeat))
+            store_dir = os.path.join(tmp, 'transactions_%d.store' % rows)
+            record('store_convert', rows, timeIt(lambda: convertCsv(csv_path, store_dir), repeat))
+            store = TransactionStore(store_dir)
+            record('store_load', rows, timeIt(lambda: store.read(FEATURE_COLUMNS, dropna=True), repeat))
+            os.remove(csv_path)
+
+            X = store.read(FEATURE_COLUMNS, dropna=True).to_numpy(dtype=np.float64)
+            record('scaler_fit', rows, timeIt(lambda: StandardScaler().fit_transform(X), repeat))
+            features_path = os.path.join(tmp, 'features_%d.npy' % rows)
+            unscaled = {}
+
+            def rebuildFeatures():
+                unscaled['features'] = buildFeatureMatrix(store, features_path)
+
+            record('scale_in_place', rows, timeIt(lambda: scaleInPlace(unscaled['features']), repeat, rebuildFeatures))
+            features = unscaled.pop('features')
+            X = StandardScaler().fit_transform(X)
+            record('kmeans_fit', rows, timeIt(lambda: KMeans(n_clusters=4, n_init=1, random_state=seed).fit(X), repeat))
+            record('pca_fit', rows, timeIt(lambda: PCA(n_components=len(FEATURE_COLUMNS)).fit(X), repeat))
+            del X, features
+
+            wide = WideFeatures().fit(store)
+            exact_rows = min(rows, max_exact_rows)
+            W = next(wide.iter_blocks(store, exact_rows))
+            exact = WidePCA(wide_components, solver='exact')
+            randomized = WidePCA(wide_components, seed=seed)
+            record('wide_pca_exact', W.shape[0], timeIt(lambda: exact.fit_matrix(W), repeat))
+            record('wide_pca_randomized', W.shape[0], timeIt(lambda: randomized.fit_matrix(W), repeat))
+            print("%-18s %d features, randomized explains %.4f of the variance, exact %.4f" % (
+                '', W.shape[1], randomized.explained_variance_ratio_.sum(), exact.explained_variance_ratio_.sum()))
+            sampled = WidePCA(wide_components, sample_size=exact_rows, seed=seed, features=wide)
+            record('wide_pca_sampled', rows, timeIt(
+                lambda: sampled.fit(store).transform_store(store, os.path.join(tmp, 'wide_pca_%d.npy' % rows)), repeat))
+            del W
+    return results
+
+
+def compareResults(results, baseline, threshold):
+    """
+    Benchmarks slower than the baseline by more than threshold.
+
+    Returns:
+    list: (key, baseline seconds, seconds, slowdown ratio) per regression
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline or not baseline[key]['seconds']:
+            continue
+        ratio = result['seconds'] / baseline[key]['seconds']
+        if ratio > 1.0 + threshold:
+            regressions.append((key, baseline[key]['seconds'], result['seconds'], ratio))
+    return regressions
+
+
+def _sizes(text):
+    return [SIZES[size] if size in SIZES else int(size) for size in text.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=_sizes, default=[SIZES['10k'], SIZES['1m']],
+                        help="comma separated row counts or 10k/1m/10m (default 10k,1m)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-loop-rows', type=int, default=100000)
+    parser.add_argument('--max-exact-rows', type=int, default=100000,
+                        help="rows of the exact vs randomized wide PCA comparison (the exact solver is dense)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="JSON file of earlier results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument('--workdir', help="directory for the synthetic data (default: system temp)")
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.sizes, args.repeat, args.max_loop_rows, args.seed, args.workdir, args.max_exact_rows)
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'max_exact_rows': args.max_exact_rows,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compareResults(results, baseline, args.threshold)
+        for key, before, after, ratio in regressions:
+            print("REGRESSION %s: %.4fs -> %.4fs (%.2fx)" % (key, before, after, ratio))
+        if regressions:
+            sys.exit(1)
+        print("no regressions beyond %.0f%% against %s" % (args.threshold * 100, args.baseline))
@@ -1,121 +1,165 @@
-from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 import pandas as pd
 import seaborn as sns
 import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
+import os
 
-csv_data = '/Users/lewiswcurtisiii/Desktop/CreditCardOptimization/CreditCardOptimization/Working Folder/Models/ccTransactions/ccTransactions_prepocessed_v3.csv'
+from transactionStore import openStore
+from featureMatrix import FEATURE_COLUMNS, buildFeatureMatrix, featureRows, scaleInPlace
+from streamingKmeans import StreamingKMeans
+from elbowSweep import sweepK
+from clusterModel import ClusterPredictor, dataFingerprint, saveClusterModel
+import modelsPath  # noqa: F401
+from instrumentation import stage  # opt in with INSTRUMENT_OUTPUT=run.json, see instrumentation.py
 
-df = pd.read_csv(csv_data)
-print(df)
-df = df.dropna()
+csv_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ccTransactions_prepocessed_v3.csv')
 
-print(df)
+# ledgers bigger than this are scaled, fitted and labelled chunk by chunk (streamingKmeans.py)
+# instead of through the in-memory K-Means on the feature memmap
+STREAMING_ROWS = 5000000
+PLOT_ROWS = 100000
 
 
+def main():
+    # typed columnar copy of the csv, only the feature columns are read
+    store = openStore(csv_data)
 
-df = df.drop(columns=["Merchant City", "Merchant State", "User", "Card", "Zip", "Time"])
+    ###Perform K-Means clustering
+    num_clusters = 4 #Adjusting number of clusters until a distinct set of clusters is shown
 
-scaler = StandardScaler()
-df_scaled = scaler.fit_transform(df)
+    if len(store) > STREAMING_ROWS:
+        # scaler and mini-batch K-Means fitted chunk by chunk (streamingKmeans.py), labels
+        # written to a memmap, so neither the ledger nor the feature matrix is ever built
+        model = StreamingKMeans(n_clusters=num_clusters, chunk_size=1000000).fit(store)
+        scaler, kmeans = model.scaler, model.kmeans
+        labels = model.predict_store(store)
+        fingerprint = None  # there is no training matrix to hash
+        print((len(labels), len(FEATURE_COLUMNS)))
+        plot_rows = np.sort(np.random.default_rng(42).choice(len(labels), min(len(labels), PLOT_ROWS), replace=False))
+        sample = featureRows(store, plot_rows)
+        # the sweep fits every k on the scaled sample instead of the whole ledger
+        sweep_data = scaler.transform(sample)
+    else:
+        # float32 rows x features memmap inside the store, scaled in place, so the ledger is never
+        # held as a DataFrame, a scaled copy and a DataFrame + Cluster column at once
+        features = buildFeatureMatrix(store)
+        fingerprint = dataFingerprint(features)
+        print(features.shape)
 
-###Perform K-Means clustering
-num_clusters = 4 #Adjusting number of clusters until a distinct set of clusters is shown
+        scaler = scaleInPlace(features, FEATURE_COLUMNS)
 
-kmeans = KMeans(n_clusters=num_clusters, random_state=42) 
+        # copy_x=False: K-Means centers the memmap in place and restores it instead of copying it
+        kmeans = KMeans(n_clusters=num_clusters, random_state=42, copy_x=False)
 
-df['Cluster'] = kmeans.fit_predict(df_scaled) #Creating another column to assign cluster number to each row 
-                                                        #based on calculated distance
+        with stage('fit', len(features)):
+            labels = kmeans.fit_predict(features) #Cluster number of each row based on calculated distance
 
+        # the plots only need a sample of rows, unscaled again with the scaler's statistics
+        plot_rows = np.sort(np.random.default_rng(42).choice(len(features), min(len(features), PLOT_ROWS), replace=False))
+        sample = scaler.inverse_transform(features[plot_rows])
+        # the sweep fits every k on the same memmap
+        sweep_data = features
 
-K_range = range(1, 11)
+    # saved so the online path can assign clusters without refitting (see clusterModel.py)
+    model_path = os.path.join(store.store_dir, 'clusterModel.npz')
+    saveClusterModel(model_path, scaler, kmeans, FEATURE_COLUMNS, fingerprint)
 
+    df = pd.DataFrame(sample, columns=FEATURE_COLUMNS)
+    df['Cluster'] = labels[plot_rows]
+    cluster_counts = pd.Series(np.bincount(labels, minlength=num_clusters), name='count').rename_axis('Cluster')
 
-# Calculate inertia for each K
-inertia = []
-for k in K_range:
-    kmeans = KMeans(n_clusters=k, random_state=42)
-    kmeans.fit(df_scaled)
-    inertia.append(kmeans.inertia_)
 
-# Plot the elbow curve
-plt.plot(K_range, inertia, marker='o')
-plt.xlabel('Number of Clusters')
-plt.ylabel('Inertia ')
-plt.title('Elbow Method for Optimal K')
-plt.show()
+    K_range = range(1, 11)
 
-# Print cluster
-print(df[['Cluster']].value_counts())  
 
-# Print cluster centers
-print("Cluster Centers (Centroids):")
-print(kmeans.cluster_centers_)
+    # Calculate inertia for each K, fitted in parallel. The sweep keeps its own models so
+    # kmeans above stays the num_clusters model used for labels
+    sweep_metrics, sweep_model = sweepK(sweep_data, K_range)
+    inertia = sweep_metrics['inertia'].tolist()
+    print(sweep_metrics)
+    print(f"Best number of clusters by silhouette: {sweep_model.n_clusters}")
 
+    # Plot the elbow curve
+    plt.plot(K_range, inertia, marker='o')
+    plt.xlabel('Number of Clusters')
+    plt.ylabel('Inertia ')
+    plt.title('Elbow Method for Optimal K')
+    plt.show()
 
+    # Print cluster
+    print(cluster_counts)
 
+    # Print cluster centers
+    print("Cluster Centers (Centroids):")
+    print(kmeans.cluster_centers_)
 
-centroids = scaler.inverse_transform(kmeans.cluster_centers_)
 
-plt.figure(figsize=(10, 8))
-sns.pairplot(df, hue='Cluster', palette='viridis')
-plt.suptitle('Pairwise Scatter Plots with Cluster Assignments', y=1.02)
-plt.savefig('pairwise_seaborn.png')
 
 
+    centroids = scaler.inverse_transform(kmeans.cluster_centers_)
 
-# Print cluster
-print(df[['Cluster']].value_counts())  
+    plt.figure(figsize=(10, 8))
+    sns.pairplot(df, hue='Cluster', palette='viridis')
+    plt.suptitle('Pairwise Scatter Plots with Cluster Assignments', y=1.02)
+    plt.savefig('pairwise_seaborn.png')
 
-# Print cluster centers
-print("Cluster Centers (Centroids):")
-print(kmeans.cluster_centers_)
 
 
+    # Print cluster
+    print(cluster_counts)
 
+    # Print cluster centers
+    print("Cluster Centers (Centroids):")
+    print(kmeans.cluster_centers_)
 
-new_data = pd.DataFrame({
- 
-    'Amount': [85.75],
-    'MCC': [5812],
-    'Month': [2],   
-    'Day': [3]     
-  
-})
 
-# Scale the new data using the same scaler
-new_data_scaled = scaler.transform(new_data)
 
-# Predict which cluster it belongs to
-cluster_prediction = kmeans.predict(new_data_scaled)
 
-print(f"The new transaction belongs to cluster: {cluster_prediction[0]}")
+    new_data = pd.DataFrame({
 
+        'Amount': [85.75],
+        'MCC': [5812],
+        'Month': [2],   
+        'Day': [3]     
 
+    })
 
-plt.figure(figsize=(10, 8))
+    # Predict which cluster it belongs to from the saved model, scaled with the same scaler stats
+    predictor = ClusterPredictor.load(model_path)
+    cluster_prediction = predictor.predict(new_data)
 
+    print(f"The new transaction belongs to cluster: {cluster_prediction[0]}")
 
-feature1 = 'Amount'
-feature2 = 'MCC'
-feature_idx1 = df.columns.get_loc(feature1)
-feature_idx2 = df.columns.get_loc(feature2)
 
-# Plot existing data points
-for cluster in range(num_clusters):
-    cluster_points = df[df['Cluster'] == cluster]
-    plt.scatter(cluster_points[feature1], cluster_points[feature2], label=f'Cluster {cluster}')
 
-# Plot the new point with a different marker
-plt.scatter(new_data[feature1], new_data[feature2], color='red', marker='*', s=200, label='New Point')
+    plt.figure(figsize=(10, 8))
 
-# Plot centroids
-plt.scatter(centroids[:, feature_idx1], centroids[:, feature_idx2], color='black', marker='X', s=100, label='Centroids')
 
-plt.xlabel(feature1)
-plt.ylabel(feature2)
-plt.title('Cluster Assignment for New Data Point')
-plt.legend()
-plt.show()
+    feature1 = 'Amount'
+    feature2 = 'MCC'
+    feature_idx1 = df.columns.get_loc(feature1)
+    feature_idx2 = df.columns.get_loc(feature2)
+
+    # Plot existing data points
+    for cluster in range(num_clusters):
+        cluster_points = df[df['Cluster'] == cluster]
+        plt.scatter(cluster_points[feature1], cluster_points[feature2], label=f'Cluster {cluster}')
+
+    # Plot the new point with a different marker
+    plt.scatter(new_data[feature1], new_data[feature2], color='red', marker='*', s=200, label='New Point')
+
+    # Plot centroids
+    plt.scatter(centroids[:, feature_idx1], centroids[:, feature_idx2], color='black', marker='X', s=100, label='Centroids')
+
+    plt.xlabel(feature1)
+    plt.ylabel(feature2)
+    plt.title('Cluster Assignment for New Data Point')
+    plt.legend()
+    plt.show()
+
+
+if __name__ == '__main__':
+    # the elbow sweep starts worker processes, which import this module again under spawn
+    main()
@@ -17,11 +17,16 @@ from sklearn.decomposition import PCA
 from IPython.display import clear_output
 from mpl_toolkits.mplot3d import Axes3D
 from sklearn import datasets
+import os
 
+from transactionStore import openStore
+from featureMatrix import FEATURE_COLUMNS, iterFeatureChunks
+from streamingPCA import StreamingPCA, selectComponents
 
 
 
-csv_data = 'Working Folder/Models/ccTransactions/ccTransactions_prepocessed_v3.csv'
+
+csv_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ccTransactions_prepocessed_v3.csv')
 
 
 
@@ -35,47 +40,62 @@ csv_data = 'Working Folder/Models/ccTransactions/ccTransactions_prepocessed_v3.c
 
 
 
-DF = pd.read_csv(csv_data)
-print(DF)
-
-
-DF = DF.dropna()
-DF = DF.drop(columns=["Merchant City", "Merchant State", "User", "Card", "Zip", "Time"])
-##--------------------------------
-## Remove and save the label
-## Next, update the label so that 
-## rather than names like "Iris-setosa"
-## we use numbers instead. 
-## This will be necessary when we "color"
-## the data in our plot
-##---------------------------------------
-DFLabel = DF["MCC"]  ## Save the Label 
-print(DFLabel)  ## print the labels
-print(type(DFLabel))  ## check the datatype you have
-
-## Remap the label names from strings to numbers
-
-
-###-------------------------------------------
-### Standardize your dataset
-###-------------------------------------------
-scaler = StandardScaler() ##Instantiate
-DF = scaler.fit_transform(DF) ## Scale data
-print(DF)
-
-###############################################
-###--------------PERFORM PCA------------------
-###############################################
-## Instantiate PCA and choose how many components
-MyPCA = PCA(n_components=4)
-Result = MyPCA.fit_transform(DF)
-## Print the values of the first component 
-print(Result[:, 0]) 
-print(Result) ## Print the new (transformed) dataset
-print("The relative eigenvalues are:", MyPCA.explained_variance_ratio_)
-print("The actual eigenvalues are:", MyPCA.explained_variance_)
-EVects = MyPCA.components_
-print("The eigenvectors are:\n", EVects)
+# ledgers bigger than this are scaled and fitted chunk by chunk (streamingPCA.py)
+# instead of as one in-memory array
+STREAMING_ROWS = 5000000
+PLOT_ROWS = 100000
+
+# typed columnar copy of the csv, only the feature columns are read
+store = openStore(csv_data)
+STREAMING = len(store) > STREAMING_ROWS
+
+if STREAMING:
+    MyPCA = StreamingPCA(n_components=4, chunk_size=1000000).fit(store)
+    Result = MyPCA.transform_store(store)
+    # MCC of the same rows, to color the plot
+    DFLabel = np.concatenate([chunk[:, FEATURE_COLUMNS.index("MCC")] for chunk in iterFeatureChunks(store)])
+    print("The relative eigenvalues are:", MyPCA.explained_variance_ratio_)
+    print("The actual eigenvalues are:", MyPCA.explained_variance_)
+    EVects = MyPCA.components_
+    print("The eigenvectors are:\n", EVects)
+else:
+    DF = store.read(FEATURE_COLUMNS, dropna=True)
+    print(DF)
+    ##--------------------------------
+    ## Remove and save the label
+    ## Next, update the label so that 
+    ## rather than names like "Iris-setosa"
+    ## we use numbers instead. 
+    ## This will be necessary when we "color"
+    ## the data in our plot
+    ##---------------------------------------
+    DFLabel = DF["MCC"]  ## Save the Label 
+    print(DFLabel)  ## print the labels
+    print(type(DFLabel))  ## check the datatype you have
+
+    ## Remap the label names from strings to numbers
+
+
+    ###-------------------------------------------
+    ### Standardize your dataset
+    ###-------------------------------------------
+    scaler = StandardScaler() ##Instantiate
+    DF = scaler.fit_transform(DF) ## Scale data
+    print(DF)
+
+    ###############################################
+    ###--------------PERFORM PCA------------------
+    ###############################################
+    ## Instantiate PCA and choose how many components
+    MyPCA = PCA(n_components=4)
+    Result = MyPCA.fit_transform(DF)
+    ## Print the values of the first component 
+    print(Result[:, 0]) 
+    print(Result) ## Print the new (transformed) dataset
+    print("The relative eigenvalues are:", MyPCA.explained_variance_ratio_)
+    print("The actual eigenvalues are:", MyPCA.explained_variance_)
+    EVects = MyPCA.components_
+    print("The eigenvectors are:\n", EVects)
 
 #################################################
 ## Visualize the transformed 3D dataset
@@ -84,11 +104,13 @@ print("The eigenvectors are:\n", EVects)
 fig2 = plt.figure()
 ax2 = fig2.add_subplot(projection='3d')
 
-x = Result[:, 0]
-y = Result[:, 1] 
-z = Result[:, 2]
+# large ledgers are plotted from a random sample of rows
+plot_rows = np.random.default_rng(42).choice(len(Result), min(len(Result), PLOT_ROWS), replace=False)
+x = Result[plot_rows, 0]
+y = Result[plot_rows, 1] 
+z = Result[plot_rows, 2]
 
-ax2.scatter(x, y, z, cmap="RdYlGn", edgecolor='k', s=200, c=DFLabel)
+ax2.scatter(x, y, z, cmap="RdYlGn", edgecolor='k', s=200, c=np.asarray(DFLabel)[plot_rows])
 ax2.set_xlabel('X')
 ax2.set_ylabel('Y')
 ax2.set_zlabel('Z')
@@ -119,6 +141,11 @@ plt.plot(
     'r-', linewidth=2, label='Cumulative Explained Variance'
 )
 plt.axhline(y=0.95, color='g', linestyle='-', label='95% Explained Variance')
+
+# smallest number of components reaching the 95% line
+n_components_95 = selectComponents(MyPCA.explained_variance_ratio_, 0.95)
+print(f"Components needed for 95% explained variance: {n_components_95}")
+plt.axvline(x=n_components_95 - 1, color='b', linestyle='--', label=f'{n_components_95} components')
 plt.legend(loc='best')
 
 
@@ -0,0 +1,120 @@
+"""
+Saved K-Means pipeline (scaler statistics + centroids) and a lightweight predictor.
+
+saveClusterModel() writes what the online path needs from a fitted StandardScaler and
+KMeans into one .npz. ClusterPredictor loads it with only NumPy, no sklearn, seaborn or
+matplotlib import and no retrain, and assigns a single transaction to a cluster in
+microseconds.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+CLUSTER_MODEL_VERSION = 1
+
+
+def dataFingerprint(features, chunk_size=1000000):
+    """
+    Hash of the training matrix, stored with the model to tell which data it was fitted on.
+
+    Parameters:
+    features (np.ndarray): rows x features matrix the model was trained on
+    chunk_size (int): Rows hashed per step, so memmaps are not loaded whole
+
+    Returns:
+    str: hex digest including the matrix shape and dtype
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((features.shape, str(features.dtype))).encode())
+    for start in range(0, len(features), chunk_size):
+        digest.update(np.ascontiguousarray(features[start:start + chunk_size]).tobytes())
+    return digest.hexdigest()
+
+
+def saveClusterModel(path, scaler, kmeans, columns, fingerprint=None):
+    """
+    Save a fitted scaler + K-Means pair.
+
+    Parameters:
+    path (str): .npz file to write
+    scaler (StandardScaler): Fitted scaler (mean_ and scale_ are stored)
+    kmeans (KMeans or MiniBatchKMeans): Fitted model (cluster_centers_ are stored)
+    columns (list): Feature names in the order the model expects them
+    fingerprint (str, optional): dataFingerprint() of the training data
+    """
+    meta = {
+        'version': CLUSTER_MODEL_VERSION,
+        'columns': list(columns),
+        'n_clusters': int(len(kmeans.cluster_centers_)),
+        'fingerprint': fingerprint,
+    }
+    np.savez(path, meta=np.array(json.dumps(meta)),
+             mean=np.asarray(scaler.mean_, dtype=np.float64),
+             scale=np.asarray(scaler.scale_, dtype=np.float64),
+             centers=np.asarray(kmeans.cluster_centers_, dtype=np.float64))
+
+
+class ClusterPredictor:
+    def __init__(self, mean, scale, centers, columns, fingerprint=None):
+        self.mean = mean
+        self.scale = scale
+        self.centers = centers
+        self.columns = list(columns)
+        self.fingerprint = fingerprint
+        # plain Python copies for predict_one, which beats NumPy call overhead for one row
+        self._mean = mean.tolist()
+        self._inv_scale = (1.0 / scale).tolist()
+        self._centers = centers.tolist()
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != CLUSTER_MODEL_VERSION:
+                raise ValueError("%s: unsupported cluster model version %r" % (path, meta['version']))
+            return cls(data['mean'], data['scale'], data['centers'], meta['columns'], meta['fingerprint'])
+
+    @property
+    def centroids(self):
+        """
+        Cluster centers in the original feature units.
+        """
+        return self.centers * self.scale + self.mean
+
+    def predict_one(self, *values, **named):
+        """
+        Cluster of a single transaction.
+
+        Parameters:
+        values: Feature values in self.columns order, or
+        named: Feature values by column name (e.g. Amount=85.75, MCC=5812, Month=2, Day=3)
+
+        Returns:
+        int: Index of the nearest centroid
+        """
+        if named:
+            values = [named[column] for column in self.columns]
+        if len(values) != len(self.columns):
+            raise ValueError("expected %d features %s, got %d" % (len(self.columns), self.columns, len(values)))
+        scaled = [(v - m) * s for v, m, s in zip(values, self._mean, self._inv_scale)]
+        best, best_distance = 0, float('inf')
+        for cluster, center in enumerate(self._centers):
+            distance = sum((x - c) * (x - c) for x, c in zip(scaled, center))
+            if distance < best_distance:
+                best, best_distance = cluster, distance
+        return best
+
+    def predict(self, X):
+        """
+        Clusters of many transactions (rows x features in self.columns order, or a DataFrame).
+        """
+        if hasattr(X, 'columns'):
+            X = X[self.columns]
+        with stage('predict', len(X)):
+            scaled = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+            distances = (scaled ** 2).sum(axis=1)[:, None] - 2 * scaled @ self.centers.T + (self.centers ** 2).sum(axis=1)
+            return distances.argmin(axis=1)
@@ -0,0 +1,372 @@
+"""
+PCA for wide, sparse transaction features.
+
+With MCC and geography one-hot encoded the feature matrix has a column per MCC, city,
+state and zip, thousands wide on a real ledger, and the exact PCA in
+ccTransactionsKmeansPCA.py (a dense SVD of the whole centered matrix) stops being
+practical. This module keeps the matrix sparse and uses a randomized SVD instead:
+
+- WideFeatures: scaled Amount/Month/Day plus one-hot MCC, Merchant City, Merchant State
+  and Zip, as float32 CSR blocks streamed out of a TransactionStore
+- WidePCA: randomized SVD (Halko, Martinsson & Tropp) of the implicitly centered sparse
+  matrix, so the mean is never subtracted into a dense copy; solver='exact' runs the
+  dense full SVD for comparison
+- sample_size: fit on a sample stratified by MCC (every MCC keeps at least
+  min_per_stratum rows, so rare one-hot columns are not lost), then project every row
+  of the store chunk by chunk with transform_store
+
+Rows are the ones iterFeatureChunks keeps (Amount, MCC, Month and Day present), so
+projections line up with buildFeatureMatrix and StreamingPCA. Missing city, state or
+zip (online purchases) just leave that one-hot group empty.
+"""
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import PCA
+
+from featureMatrix import FEATURE_COLUMNS, iterUsableRows
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+NUMERIC_COLUMNS = ['Amount', 'Month', 'Day']
+ONE_HOT_COLUMNS = ['MCC', 'Merchant City', 'Merchant State', 'Zip']
+SOLVERS = ('randomized', 'exact')
+
+
+def _validChunks(store, chunk_size, columns):
+    """
+    (store row positions, {column: values}) per chunk, for the rows iterUsableRows keeps.
+    """
+    stored = {name: store.column(name) for name in columns}
+    for start, valid in iterUsableRows(store, FEATURE_COLUMNS, chunk_size):
+        positions = start + np.flatnonzero(valid)
+        if len(positions):
+            yield positions, {name: np.asarray(column[start:start + chunk_size])[valid]
+                              for name, column in stored.items()}
+
+
+def stratifiedSample(store, size, column='MCC', min_per_stratum=10, chunk_size=1000000, seed=0):
+    """
+    Row positions of a sample of about `size` usable rows, stratified by a column.
+
+    Each stratum is sampled in proportion to its size, except that strata too small to
+    get min_per_stratum rows that way get min_per_stratum rows (or all of theirs). Rows
+    are kept independently with their stratum's rate, so the store is streamed twice and
+    only the sample is ever held.
+
+    Parameters:
+    store (TransactionStore): Columnar transaction store
+    size (int): Wanted sample size
+    column (str): Stratum column
+    min_per_stratum (int): Fewest rows per stratum
+    chunk_size (int): Store rows read per step
+    seed (int): Seed, the same arguments give the same sample
+
+    Returns:
+    np.ndarray: Sorted int64 store row positions
+    """
+    strata = []
+    counts = []
+    for _, values in _validChunks(store, chunk_size, [column]):
+        chunk_strata, chunk_counts = np.unique(values[column], return_counts=True)
+        strata.append(chunk_strata)
+        counts.append(chunk_counts)
+    if not strata:
+        return np.empty(0, dtype=np.int64)
+    strata, inverse = np.unique(np.concatenate(strata), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(counts))
+
+    rate = np.minimum(1.0, np.maximum(size / counts.sum(), min_per_stratum / counts))
+    rng = np.random.default_rng(seed)
+    sample = []
+    for positions, values in _validChunks(store, chunk_size, [column]):
+        keep = rng.random(len(positions)) < rate[np.searchsorted(strata, values[column])]
+        sample.append(positions[keep])
+    return np.concatenate(sample)
+
+
+class WideFeatures:
+    def __init__(self, numeric=NUMERIC_COLUMNS, one_hot=ONE_HOT_COLUMNS, min_count=1):
+        """
+        Parameters:
+        numeric (list): Columns standardized as they are
+        one_hot (list): Columns with one 0/1 feature per value
+        min_count (int): Values seen fewer times than this get no feature of their own
+        """
+        self.numeric = list(numeric)
+        self.one_hot = list(one_hot)
+        self.min_count = min_count
+        self.mean_ = None
+        self.scale_ = None
+        self.vocabularies_ = None
+
+    @property
+    def columns(self):
+        return self.numeric + self.one_hot
+
+    @property
+    def n_features_(self):
+        return len(self.numeric) + sum(len(vocabulary) for vocabulary in self.vocabularies_.values())
+
+    def feature_names(self, store=None):
+        """
+        Name of every feature, 'Column=value' for the one-hot ones (dictionary columns by
+        their string value when store is given, by code otherwise).
+        """
+        names = list(self.numeric)
+        for name in self.one_hot:
+            dictionary = store.meta['columns'][name]['dictionary'] if store is not None else None
+            names.extend('%s=%s' % (name, dictionary[value] if dictionary else value)
+                         for value in self.vocabularies_[name])
+        return names
+
+    def fit(self, store, chunk_size=1000000):
+        """
+        Mean and standard deviation of the numeric columns and the values of the one-hot
+        columns, in one pass over the usable rows of a store.
+
+        Returns:
+        WideFeatures: self
+        """
+        rows = 0
+        total = np.zeros(len(self.numeric))
+        squares = np.zeros(len(self.numeric))
+        values = {name: [] for name in self.one_hot}
+        counts = {name: [] for name in self.one_hot}
+        for _, block in _validChunks(store, chunk_size, self.columns):
+            numeric = np.column_stack([block[name] for name in self.numeric]).astype(np.float64)
+            rows += len(numeric)
+            total += numeric.sum(axis=0)
+            squares += (numeric ** 2).sum(axis=0)
+            for name in self.one_hot:
+                present = block[name][block[name] >= 0]
+                chunk_values, chunk_counts = np.unique(present, return_counts=True)
+                values[name].append(chunk_values)
+                counts[name].append(chunk_counts)
+
+        self.mean_ = total / max(rows, 1)
+        variance = np.maximum(squares / max(rows, 1) - self.mean_ ** 2, 0.0)
+        self.scale_ = np.sqrt(variance)
+        self.scale_[self.scale_ == 0] = 1.0  # constant columns are left centered, like StandardScaler
+        self.vocabularies_ = {}
+        for name in self.one_hot:
+            if not values[name]:
+                self.vocabularies_[name] = np.empty(0, dtype=np.int64)
+                continue
+            merged, inverse = np.unique(np.concatenate(values[name]), return_inverse=True)
+            total_counts = np.bincount(inverse, weights=np.concatenate(counts[name]))
+            self.vocabularies_[name] = merged[total_counts >= self.min_count]
+        return self
+
+    def transform(self, block):
+        """
+        One CSR block from column arrays.
+
+        Parameters:
+        block (dict): Column name -> values of the same rows, for every column in self.columns
+
+        Returns:
+        sp.csr_matrix: rows x n_features_ float32
+        """
+        rows = len(block[self.numeric[0]] if self.numeric else block[self.one_hot[0]])
+        numeric = (np.column_stack([block[name] for name in self.numeric]).astype(np.float64) - self.mean_) / self.scale_
+        row_ids = [np.repeat(np.arange(rows), len(self.numeric))]
+        col_ids = [np.tile(np.arange(len(self.numeric)), rows)]
+        data = [numeric.ravel().astype(np.float32)]
+
+        offset = len(self.numeric)
+        for name in self.one_hot:
+            vocabulary = self.vocabularies_[name]
+            values = np.asarray(block[name])
+            position = np.searchsorted(vocabulary, values)
+            if len(vocabulary):
+                known = vocabulary[np.minimum(position, len(vocabulary) - 1)] == values
+            else:
+                known = np.zeros(rows, dtype=bool)
+            row_ids.append(np.flatnonzero(known))
+            col_ids.append(offset + position[known])
+            data.append(np.ones(int(known.sum()), dtype=np.float32))
+            offset += len(vocabulary)
+
+        return sp.csr_matrix((np.concatenate(data), (np.concatenate(row_ids), np.concatenate(col_ids))),
+                             shape=(rows, offset), dtype=np.float32)
+
+    def read_rows(self, store, positions):
+        """
+        CSR features of the given store row positions (sorted, usable rows only).
+        """
+        block = {name: np.asarray(store.column(name)[positions]) for name in self.columns}
+        return self.transform(block)
+
+    def iter_blocks(self, store, chunk_size=1000000):
+        """
+        Stream CSR feature blocks of every usable row of a store.
+
+        Yields:
+        sp.csr_matrix: rows x n_features_ float32 block
+        """
+        for _, block in _validChunks(store, chunk_size, self.columns):
+            yield self.transform(block)
+
+
+def randomizedSvd(X, mean, n_components, n_oversamples=10, n_iter=4, seed=0):
+    """
+    Truncated SVD of X - mean (X sparse or dense) without forming the centered matrix.
+
+    The range of the centered matrix is found from (X - 1 mean) Q = X Q - 1 (mean Q) and
+    (X - 1 mean)' Q = X' Q - mean' (1' Q), refined with n_iter power iterations, each
+    followed by a QR so small singular values are not lost to rounding.
+
+    Parameters:
+    X (sp.spmatrix or np.ndarray): rows x features matrix
+    mean (np.ndarray): Column means to center by
+    n_components (int): Singular vectors to keep
+    n_oversamples (int): Extra random vectors, more is more accurate and slower
+    n_iter (int): Power iterations
+    seed (int): Seed of the random test matrix
+
+    Returns:
+    tuple: (U, S, Vt) of the n_components largest singular values
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+
+    def times(Q):
+        return X @ Q - mean @ Q
+
+    def times_transposed(Q):
+        return X.T @ Q - np.outer(mean, Q.sum(axis=0))
+
+    rng = np.random.default_rng(seed)
+    size = min(n_components + n_oversamples, min(X.shape))
+    Q, _ = np.linalg.qr(times(rng.standard_normal((X.shape[1], size))))
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(times_transposed(Q))
+        Q, _ = np.linalg.qr(times(Q))
+
+    B = times_transposed(Q).T  # size x features, the centered X projected onto the range
+    U, S, Vt = np.linalg.svd(B, full_matrices=False)
+    return (Q @ U)[:, :n_components], S[:n_components], Vt[:n_components]
+
+
+class WidePCA:
+    def __init__(self, n_components=50, solver='randomized', sample_size=None, stratify='MCC',
+                 min_per_stratum=10, n_oversamples=10, n_iter=4, chunk_size=1000000, seed=0, features=None):
+        """
+        Parameters:
+        n_components (int): Components to keep
+        solver (str): 'randomized' (sparse, truncated) or 'exact' (dense full SVD)
+        sample_size (int, optional): Fit on a stratified sample of about this many rows,
+            on every usable row if None
+        stratify (str): Column the sample is stratified by
+        min_per_stratum (int): Fewest sampled rows per stratum
+        n_oversamples (int): Randomized solver's extra random vectors
+        n_iter (int): Randomized solver's power iterations
+        chunk_size (int): Store rows read per step
+        seed (int): Seed of the sample and the randomized solver
+        features (WideFeatures, optional): Feature layout, the default WideFeatures if None
+        """
+        if solver not in SOLVERS:
+            raise ValueError("solver must be one of %s" % (SOLVERS,))
+        self.n_components = n_components
+        self.solver = solver
+        self.sample_size = sample_size
+        self.stratify = stratify
+        self.min_per_stratum = min_per_stratum
+        self.n_oversamples = n_oversamples
+        self.n_iter = n_iter
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.features = WideFeatures() if features is None else features
+        self.mean_ = None
+        self.components_ = None
+        self.explained_variance_ = None
+        self.explained_variance_ratio_ = None
+        self.n_samples_ = None
+
+    def fit(self, store):
+        """
+        Fit the feature layout on the whole store, then the PCA on every usable row or on
+        a stratified sample of them.
+
+        Parameters:
+        store (TransactionStore): Columnar transaction store
+
+        Returns:
+        WidePCA: self
+        """
+        with stage('scale', len(store)):
+            self.features.fit(store, self.chunk_size)
+        with stage('load') as loading:
+            if self.sample_size is None:
+                X = sp.vstack(list(self.features.iter_blocks(store, self.chunk_size)), format='csr')
+            else:
+                positions = stratifiedSample(store, self.sample_size, self.stratify, self.min_per_stratum,
+                                             self.chunk_size, self.seed)
+                X = self.features.read_rows(store, positions)
+            loading.add_rows(X.shape[0])
+        return self.fit_matrix(X)
+
+    def fit_matrix(self, X):
+        """
+        Fit on a feature matrix already in memory (sparse or dense), e.g. from WideFeatures.
+
+        Returns:
+        WidePCA: self
+        """
+        rows, width = X.shape
+        n_components = min(self.n_components, rows, width)
+        with stage('fit', rows):
+            mean = np.asarray(X.mean(axis=0, dtype=np.float64)).ravel()
+            if sp.issparse(X):
+                squares = np.asarray(X.multiply(X).sum(axis=0, dtype=np.float64)).ravel()
+            else:
+                squares = (np.asarray(X, dtype=np.float64) ** 2).sum(axis=0)
+            total_variance = (squares - rows * mean ** 2).sum() / max(rows - 1, 1)
+
+            if self.solver == 'exact':
+                dense = X.toarray() if sp.issparse(X) else np.asarray(X)
+                pca = PCA(n_components=n_components, svd_solver='full').fit(dense.astype(np.float64))
+                components, variance = pca.components_, pca.explained_variance_
+            else:
+                _, singular, components = randomizedSvd(X, mean, n_components, self.n_oversamples, self.n_iter,
+                                                        self.seed)
+                variance = singular ** 2 / max(rows - 1, 1)
+
+        self.mean_ = mean
+        self.components_ = components
+        self.explained_variance_ = variance
+        self.explained_variance_ratio_ = variance / total_variance if total_variance > 0 else np.zeros_like(variance)
+        self.n_samples_ = rows
+        return self
+
+    def transform(self, X):
+        """
+        Project feature rows (sparse or dense, in the WideFeatures layout) onto the components.
+        """
+        return np.asarray(X @ self.components_.T) - self.mean_ @ self.components_.T
+
+    def transform_store(self, store, path=None):
+        """
+        Project every usable row of a store, one chunk at a time.
+
+        Parameters:
+        store (TransactionStore): Columnar transaction store
+        path (str, optional): .npy file to write, defaults to wide_pca.npy inside the store
+
+        Returns:
+        np.memmap: rows x n_components float32 projections, aligned with the rows
+            buildFeatureMatrix keeps
+        """
+        if path is None:
+            path = os.path.join(store.store_dir, 'wide_pca.npy')
+        rows = sum(len(positions) for positions, _ in _validChunks(store, self.chunk_size, []))  # sized first so the output can be a memmap
+        result = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32,
+                                           shape=(rows, len(self.components_)))
+        row = 0
+        with stage('predict', rows):
+            for block in self.features.iter_blocks(store, self.chunk_size):
+                result[row:row + block.shape[0]] = self.transform(block)
+                row += block.shape[0]
+        result.flush()
+        return result
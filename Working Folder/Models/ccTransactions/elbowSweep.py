@@ -0,0 +1,167 @@
+"""
+Parallel model selection for the number of K-Means clusters.
+
+Replaces the serial elbow loop in ccTransactionsKmeans.py: candidate k values are fitted
+concurrently in a process pool, every worker memory-maps the same scaled matrix instead
+of receiving a pickled copy, the sweep can run on a random subsample, and each k is
+reported with inertia, silhouette and Davies-Bouldin scores. The chosen k is then
+refitted on the full data, warm-started from the sweep's centers.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from threadpoolctl import threadpool_limits
+
+_sweep_X = None
+_sweep_options = None
+
+
+def _attachSweepData(path, options, single_thread=True):
+    global _sweep_X, _sweep_options
+    _sweep_X = np.load(path, mmap_mode='r')
+    _sweep_options = options
+    if single_thread:
+        # one BLAS/OpenMP thread per worker, the pool already uses every core
+        threadpool_limits(1)
+
+
+def _fitK(k):
+    X = _sweep_X
+    kmeans = KMeans(n_clusters=k, random_state=_sweep_options['random_state'], n_init=_sweep_options['n_init'])
+    labels = kmeans.fit_predict(X)
+    silhouette = davies_bouldin = np.nan
+    if 1 < k < len(X):
+        silhouette = silhouette_score(X, labels, sample_size=min(_sweep_options['silhouette_sample'], len(X)),
+                                      random_state=_sweep_options['random_state'])
+        davies_bouldin = davies_bouldin_score(X, labels)
+    return k, kmeans.inertia_, silhouette, davies_bouldin, kmeans.cluster_centers_
+
+
+def _wholeNpy(X):
+    """
+    The .npy file X maps, if X is a memmap of that whole file's array (not a slice of it).
+    """
+    if not isinstance(X, np.memmap) or not X.filename or not X.filename.endswith('.npy'):
+        return None
+    full = np.load(X.filename, mmap_mode='r')
+    # a C-contiguous view of the same size and dtype can only be the whole array
+    if X.shape != full.shape or X.dtype != full.dtype or not X.flags.c_contiguous:
+        return None
+    return X.filename
+
+
+def _sweepTempDir(nbytes):
+    # tmpfs when it has room for the copy with some to spare (Docker gives /dev/shm 64MB
+    # by default), the regular temp dir otherwise
+    if os.path.isdir('/dev/shm') and shutil.disk_usage('/dev/shm').free > 2 * nbytes:
+        return tempfile.mkdtemp(dir='/dev/shm')
+    return tempfile.mkdtemp()
+
+
+def _bootstrapping():
+    # True while a spawned child is still importing its parent's __main__ (the same check
+    # multiprocessing's own spawn uses), a pool started then would re-run the script again
+    return getattr(multiprocessing.current_process(), '_inheriting', False)
+
+
+def _elbow(k_values, inertia):
+    # largest bend in the inertia curve: biggest second difference
+    if len(k_values) < 3:
+        return k_values[int(np.argmin(inertia))]
+    bend = np.diff(inertia, 2)
+    return k_values[int(np.argmax(bend)) + 1]
+
+
+def sweepK(X, k_values=range(1, 11), workers=None, sample_size=None, criterion='silhouette',
+           random_state=42, n_init='auto', silhouette_sample=10000):
+    """
+    Fit K-Means for every candidate k in parallel and pick one.
+
+    Parameters:
+    X (np.ndarray): Scaled feature matrix (a memmap from buildFeatureMatrix is used as is)
+    k_values (iterable): Candidate numbers of clusters
+    workers (int, optional): Worker processes, defaults to os.cpu_count(), 1 runs serially
+    sample_size (int, optional): Rows sampled for the sweep, all rows if None
+    criterion (str): 'silhouette' (highest), 'davies_bouldin' (lowest) or 'elbow' (inertia bend)
+    random_state (int): Seed for sampling and K-Means
+    n_init (int or str): K-Means initializations per k during the sweep, sklearn's
+        default ('auto', one k-means++ init) like the serial loop it replaces
+    silhouette_sample (int): Rows used to estimate each silhouette score
+
+    Returns:
+    tuple: (pd.DataFrame of inertia/silhouette/davies_bouldin indexed by k,
+            KMeans fitted on the full X with the chosen k)
+
+    With workers > 1 the caller's script must keep its work behind
+    `if __name__ == '__main__':`, spawned workers (macOS and Windows) import it again.
+    """
+    k_values = sorted(k_values)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and _bootstrapping():
+        raise RuntimeError("sweepK was called while a worker process was importing the main module; "
+                           "put the calling script's code behind if __name__ == '__main__':")
+    options = {'random_state': random_state, 'n_init': n_init, 'silhouette_sample': silhouette_sample}
+
+    sample = X
+    if sample_size is not None and sample_size < len(X):
+        rows = np.sort(np.random.default_rng(random_state).choice(len(X), size=sample_size, replace=False))
+        sample = np.asarray(X[rows])
+
+    # workers map the sweep data read-only: the existing .npy for a memmap of a whole
+    # file, otherwise a temporary copy, on tmpfs when it has room
+    tmp_dir = None
+    path = _wholeNpy(sample)
+    if path is not None:
+        if sample.flags.writeable:
+            sample.flush()  # workers read the file, not this process' dirty pages
+    else:
+        sample = np.ascontiguousarray(sample)
+        tmp_dir = _sweepTempDir(sample.nbytes)
+        path = os.path.join(tmp_dir, 'sweep.npy')
+        try:
+            np.save(path, sample)
+        except OSError:
+            if not tmp_dir.startswith('/dev/shm'):
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir = tempfile.mkdtemp()
+            path = os.path.join(tmp_dir, 'sweep.npy')
+            np.save(path, sample)
+
+    try:
+        if workers <= 1:
+            _attachSweepData(path, options, single_thread=False)
+            results = [_fitK(k) for k in k_values]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attachSweepData,
+                                     initargs=(path, options)) as pool:
+                # largest k first, they take longest
+                results = sorted(pool.map(_fitK, sorted(k_values, reverse=True)))
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    metrics = pd.DataFrame([r[:4] for r in results], columns=['k', 'inertia', 'silhouette', 'davies_bouldin']).set_index('k')
+    centers = {r[0]: r[4] for r in results}
+
+    if criterion == 'elbow':
+        best_k = _elbow(k_values, metrics['inertia'].to_numpy())
+    elif criterion == 'silhouette':
+        best_k = int(metrics['silhouette'].idxmax())
+    elif criterion == 'davies_bouldin':
+        best_k = int(metrics['davies_bouldin'].idxmin())
+    else:
+        raise ValueError("criterion must be 'silhouette', 'davies_bouldin' or 'elbow', got %r" % criterion)
+
+    # full-data fit warm-started from the sweep's centers for the chosen k
+    model = KMeans(n_clusters=best_k, init=centers[best_k], n_init=1, random_state=random_state)
+    model.fit(X)
+    return metrics, model
@@ -0,0 +1,182 @@
+"""
+Memory-mapped float32 feature matrix for the clustering scripts.
+
+The numeric feature columns are copied out of a TransactionStore into a single
+rows x features .npy file once, and scaling and K-Means then work on that buffer in
+place, so a ledger only has to fit on disk instead of in RAM three times over
+(DataFrame, scaled copy, DataFrame + Cluster column).
+"""
+import os
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+FEATURE_COLUMNS = ['Amount', 'MCC', 'Month', 'Day']
+
+
+def _present(values):
+    if values.dtype.kind == 'f':
+        return ~np.isnan(values)
+    return values >= 0  # integer and dictionary columns store missing as -1
+
+
+def iterUsableRows(store, columns=FEATURE_COLUMNS, chunk_size=1000000):
+    """
+    The rows every feature path keeps, those with a value in each of the columns.
+
+    Parameters:
+    store (TransactionStore): Columnar transaction store
+    columns (list): Columns that must be present
+    chunk_size (int): Store rows checked per step
+
+    Yields:
+    tuple: (first store row of the chunk, bool mask over the chunk's rows)
+    """
+    stored = [store.column(name) for name in columns]
+    for start in range(0, len(store), chunk_size):
+        yield start, np.logical_and.reduce([_present(column[start:start + chunk_size]) for column in stored])
+
+
+def _validRows(store, columns, chunk_size):
+    valid = np.empty(len(store), dtype=bool)
+    for start, chunk_valid in iterUsableRows(store, columns, chunk_size):
+        valid[start:start + len(chunk_valid)] = chunk_valid
+    return valid
+
+
+def iterFeatureChunks(store, columns=FEATURE_COLUMNS, chunk_size=1000000, dropna=True):
+    """
+    Stream the feature columns of a store as float32 rows x features blocks, so a model
+    can be fit without the whole matrix in memory or on disk.
+
+    Parameters:
+    store (TransactionStore): Columnar transaction store
+    columns (list): Numeric columns to use as features, in order
+    chunk_size (int): Store rows read per block (blocks can be shorter after dropna)
+    dropna (bool): Leave out rows with a missing value in any feature column
+
+    Yields:
+    np.ndarray: float32 block of feature rows
+    """
+    stored = [store.column(name) for name in columns]
+    for start in range(0, len(store), chunk_size):
+        values = [column[start:start + chunk_size] for column in stored]
+        block = np.column_stack(values).astype(np.float32)
+        if dropna:
+            valid = np.logical_and.reduce([_present(v) for v in values])
+            block = block[valid]
+        if len(block):
+            yield block
+
+
+def featureRows(store, rows, columns=FEATURE_COLUMNS, chunk_size=1000000):
+    """
+    Gather some rows of the streamed feature matrix, e.g. a sample to plot, without
+    building the matrix.
+
+    Parameters:
+    store (TransactionStore): Columnar transaction store
+    rows (array-like): Sorted positions among the rows iterFeatureChunks keeps
+    columns (list): Numeric columns to use as features, in order
+    chunk_size (int): Store rows read per block
+
+    Returns:
+    np.ndarray: len(rows) x features float32
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    out = np.empty((len(rows), len(columns)), dtype=np.float32)
+    seen = 0
+    for block in iterFeatureChunks(store, columns, chunk_size):
+        first, last = np.searchsorted(rows, [seen, seen + len(block)])
+        out[first:last] = block[rows[first:last] - seen]
+        seen += len(block)
+    return out
+
+
+def buildFeatureMatrix(store, path=None, columns=FEATURE_COLUMNS, dropna=True, chunk_size=1000000):
+    """
+    Write the selected numeric columns of a store into a float32 memory-mapped matrix.
+
+    Parameters:
+    store (TransactionStore): Columnar transaction store
+    path (str, optional): .npy file to write, defaults to features.npy inside the store
+    columns (list): Numeric columns to use as features, in order
+    dropna (bool): Leave out rows with a missing value in any feature column
+    chunk_size (int): Rows copied per step
+
+    Returns:
+    np.memmap: rows x features float32 matrix backed by path, opened read/write
+    """
+    if path is None:
+        path = os.path.join(store.store_dir, 'features.npy')
+    columns = list(columns)
+    valid = _validRows(store, columns, chunk_size) if dropna else np.ones(len(store), dtype=bool)
+
+    features = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(int(valid.sum()), len(columns)))
+    for j, name in enumerate(columns):
+        column = store.column(name)
+        row = 0
+        for start in range(0, len(store), chunk_size):
+            values = column[start:start + chunk_size][valid[start:start + chunk_size]]
+            features[row:row + len(values), j] = values
+            row += len(values)
+    features.flush()
+    return features
+
+
+def openFeatureMatrix(path, mode='r+'):
+    """
+    Re-open a feature matrix written by buildFeatureMatrix without loading it.
+    """
+    return np.load(path, mmap_mode=mode)
+
+
+def scaleInPlace(features, columns=None, chunk_size=1000000):
+    """
+    Standardize a feature matrix in place, chunk by chunk.
+
+    Mean and variance are accumulated in float64 over the chunks, then each chunk is
+    centered and scaled in place, so no scaled copy of the matrix is ever made.
+
+    Parameters:
+    features (np.ndarray): rows x features float32 matrix, typically from buildFeatureMatrix
+    columns (list, optional): Feature names, so the scaler accepts DataFrames of new data
+    chunk_size (int): Rows processed per step
+
+    Returns:
+    StandardScaler: Scaler fitted with the same statistics, for transform/inverse_transform
+        of new data
+    """
+    rows = len(features)
+    with stage('scale', rows):
+        total = np.zeros(features.shape[1], dtype=np.float64)
+        for start in range(0, rows, chunk_size):
+            total += features[start:start + chunk_size].sum(axis=0, dtype=np.float64)
+        mean = total / max(rows, 1)
+
+        squares = np.zeros(features.shape[1], dtype=np.float64)
+        for start in range(0, rows, chunk_size):
+            squares += ((features[start:start + chunk_size] - mean) ** 2).sum(axis=0)
+        var = squares / max(rows, 1)
+        scale = np.sqrt(var)
+        scale[scale == 0] = 1.0  # constant columns are left centered, like StandardScaler
+
+        for start in range(0, rows, chunk_size):
+            chunk = features[start:start + chunk_size]
+            chunk -= mean.astype(np.float32)
+            chunk /= scale.astype(np.float32)
+        if isinstance(features, np.memmap):
+            features.flush()
+
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = scale
+    scaler.n_samples_seen_ = rows
+    scaler.n_features_in_ = features.shape[1]
+    if columns is not None:
+        scaler.feature_names_in_ = np.array(columns, dtype=object)
+    return scaler
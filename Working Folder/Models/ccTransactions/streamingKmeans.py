@@ -0,0 +1,123 @@
+"""
+Out-of-core K-Means for transaction segmentation.
+
+Same artifacts as ccTransactionsKmeans.py (scaled centroids, a cluster label per row and
+centroids in original units) but the store is streamed in chunks: a StandardScaler is
+fitted with partial_fit (running mean/variance), then a MiniBatchKMeans is fitted with
+partial_fit on the scaled chunks, so memory is bounded by the chunk size rather than
+the ledger size.
+"""
+import os
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from featureMatrix import FEATURE_COLUMNS, iterFeatureChunks
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+
+class StreamingKMeans:
+    def __init__(self, n_clusters=4, chunk_size=100000, passes=1, random_state=42, columns=FEATURE_COLUMNS):
+        self.n_clusters = n_clusters
+        self.chunk_size = chunk_size
+        self.passes = passes  # epochs of partial_fit over the store
+        self.random_state = random_state
+        self.columns = list(columns)
+        self.scaler = None
+        self.kmeans = None
+
+    def _chunks(self, store):
+        return iterFeatureChunks(store, self.columns, self.chunk_size)
+
+    def fit(self, store):
+        """
+        Fit the streaming scaler and mini-batch K-Means over a TransactionStore.
+
+        Parameters:
+        store (TransactionStore): Columnar transaction store
+
+        Returns:
+        StreamingKMeans: self
+        """
+        self.scaler = StandardScaler()
+        with stage('scale') as scaling:
+            for chunk in self._chunks(store):
+                self.scaler.partial_fit(chunk)
+                scaling.add_rows(len(chunk))
+
+        self.kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, random_state=self.random_state,
+                                      batch_size=min(self.chunk_size, 4096), n_init=3)
+        with stage('fit') as fitting:
+            for _ in range(self.passes):
+                pending = None
+                for chunk in self._chunks(store):
+                    fitting.add_rows(len(chunk))
+                    scaled = self.scaler.transform(chunk)
+                    # the first partial_fit needs at least n_clusters rows to initialize centers
+                    if pending is not None:
+                        scaled = np.vstack([pending, scaled])
+                        pending = None
+                    if not hasattr(self.kmeans, 'cluster_centers_') and len(scaled) < self.n_clusters:
+                        pending = scaled
+                        continue
+                    self.kmeans.partial_fit(scaled)
+                if pending is not None:
+                    raise ValueError("store has fewer usable rows than n_clusters=%d" % self.n_clusters)
+        return self
+
+    @property
+    def cluster_centers_(self):
+        return self.kmeans.cluster_centers_
+
+    @property
+    def centroids(self):
+        """
+        Cluster centers in the original feature units.
+        """
+        return self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+
+    def predict(self, X):
+        """
+        Cluster labels for unscaled feature rows (array or DataFrame in self.columns order).
+        """
+        return self.kmeans.predict(self.scaler.transform(np.asarray(X, dtype=np.float32)))
+
+    def predict_store(self, store, path=None):
+        """
+        Label every usable row of a store, one chunk at a time.
+
+        Parameters:
+        store (TransactionStore): Columnar transaction store
+        path (str, optional): .npy file to write labels to, defaults to labels.npy inside the store
+
+        Returns:
+        np.memmap: int32 cluster label per row, aligned with the rows buildFeatureMatrix keeps
+        """
+        if path is None:
+            path = os.path.join(store.store_dir, 'labels.npy')
+        rows = sum(len(chunk) for chunk in self._chunks(store))  # sized first so labels can be a memmap
+        labels = np.lib.format.open_memmap(path, mode='w+', dtype=np.int32, shape=(rows,))
+        row = 0
+        with stage('predict', rows):
+            for chunk in self._chunks(store):
+                labels[row:row + len(chunk)] = self.predict(chunk)
+                row += len(chunk)
+        labels.flush()
+        return labels
+
+
+if __name__ == '__main__':
+    from transactionStore import openStore
+
+    csv_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ccTransactions_prepocessed_v3.csv')
+    store = openStore(csv_data)
+
+    model = StreamingKMeans(n_clusters=4, chunk_size=100).fit(store)
+    labels = model.predict_store(store)
+    print(np.unique(np.asarray(labels), return_counts=True))
+    print("Cluster Centers (Centroids):")
+    print(model.cluster_centers_)
+    print(model.centroids)
+    print(f"The new transaction belongs to cluster: {model.predict([[85.75, 5812, 2, 3]])[0]}")
@@ -0,0 +1,146 @@
+"""
+Out-of-core PCA for transaction features.
+
+Same outputs as the PCA in ccTransactionsKmeansPCA.py (explained_variance_ratio_,
+components_, projections) but the store is streamed in chunks: a StandardScaler is
+fitted with partial_fit, then an IncrementalPCA with partial_fit on the scaled chunks,
+so memory is bounded by the chunk size rather than the ledger size. With every component
+kept (the default for narrow feature sets) the incremental SVD is exact and matches PCA
+on the full scaled array up to float error and component signs.
+
+n_components can also be picked from the data: the smallest count whose cumulative
+explained variance reaches `variance` (95% by default).
+"""
+import os
+
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from featureMatrix import FEATURE_COLUMNS, iterFeatureChunks
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+
+def selectComponents(explained_variance_ratio, variance=0.95):
+    """
+    Smallest number of components whose cumulative explained variance reaches variance.
+    """
+    cumulative = np.cumsum(explained_variance_ratio)
+    return int(min(np.searchsorted(cumulative, variance - 1e-12) + 1, len(cumulative)))
+
+
+class StreamingPCA:
+    def __init__(self, n_components=None, variance=0.95, chunk_size=100000, columns=FEATURE_COLUMNS,
+                 max_components=None):
+        """
+        Parameters:
+        n_components (int, optional): Components to keep, picked by variance if None
+        variance (float): Cumulative explained variance n_components is picked to reach
+        chunk_size (int): Store rows per partial_fit
+        columns (list): Feature columns, in order
+        max_components (int, optional): Components the incremental SVD tracks, every
+            feature if None (exact). Lower it for wide feature sets
+        """
+        self.n_components = n_components
+        self.variance = variance
+        self.chunk_size = chunk_size
+        self.columns = list(columns)
+        self.max_components = max_components
+        self.scaler = None
+        self.pca = None
+        self.n_components_ = None
+
+    def _chunks(self, store):
+        return iterFeatureChunks(store, self.columns, self.chunk_size)
+
+    def fit(self, store):
+        """
+        Fit the streaming scaler and incremental PCA over a TransactionStore.
+
+        Parameters:
+        store (TransactionStore): Columnar transaction store
+
+        Returns:
+        StreamingPCA: self
+        """
+        self.scaler = StandardScaler()
+        with stage('scale') as scaling:
+            for chunk in self._chunks(store):
+                self.scaler.partial_fit(chunk)
+                scaling.add_rows(len(chunk))
+
+        tracked = len(self.columns) if self.max_components is None else self.max_components
+        if self.n_components is not None:
+            tracked = max(tracked, self.n_components)
+        self.pca = IncrementalPCA(n_components=tracked)
+        with stage('fit') as fitting:
+            # each partial_fit needs at least `tracked` rows, so a batch is only fitted once
+            # the next one is known to be big enough to stand alone; short ones are merged
+            held = None
+            for chunk in self._chunks(store):
+                fitting.add_rows(len(chunk))
+                scaled = self.scaler.transform(chunk)
+                if held is None:
+                    held = scaled
+                elif len(held) < tracked or len(scaled) < tracked:
+                    held = np.vstack([held, scaled])
+                else:
+                    self.pca.partial_fit(held)
+                    held = scaled
+            if held is None or len(held) < tracked:
+                raise ValueError("store has fewer usable rows than n_components=%d" % tracked)
+            self.pca.partial_fit(held)
+
+        if self.n_components is None:
+            self.n_components_ = selectComponents(self.pca.explained_variance_ratio_, self.variance)
+        else:
+            self.n_components_ = self.n_components
+        return self
+
+    @property
+    def explained_variance_ratio_(self):
+        return self.pca.explained_variance_ratio_
+
+    @property
+    def explained_variance_(self):
+        return self.pca.explained_variance_
+
+    @property
+    def components_(self):
+        """
+        The kept components, n_components_ x features.
+        """
+        return self.pca.components_[:self.n_components_]
+
+    def transform(self, X):
+        """
+        Project unscaled feature rows (array or DataFrame in self.columns order) onto the
+        kept components.
+        """
+        scaled = self.scaler.transform(np.asarray(X, dtype=np.float32))
+        return (scaled - self.pca.mean_) @ self.components_.T
+
+    def transform_store(self, store, path=None):
+        """
+        Project every usable row of a store, one chunk at a time.
+
+        Parameters:
+        store (TransactionStore): Columnar transaction store
+        path (str, optional): .npy file to write, defaults to pca.npy inside the store
+
+        Returns:
+        np.memmap: rows x n_components_ float32 projections, aligned with the rows
+            buildFeatureMatrix keeps
+        """
+        if path is None:
+            path = os.path.join(store.store_dir, 'pca.npy')
+        rows = sum(len(chunk) for chunk in self._chunks(store))  # sized first so the output can be a memmap
+        result = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(rows, self.n_components_))
+        row = 0
+        with stage('predict', rows):
+            for chunk in self._chunks(store):
+                result[row:row + len(chunk)] = self.transform(chunk)
+                row += len(chunk)
+        result.flush()
+        return result
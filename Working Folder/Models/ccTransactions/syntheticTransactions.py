@@ -0,0 +1,189 @@
+"""
+Synthetic transaction ledgers in the preprocessed csv layouts, at any size.
+
+    python syntheticTransactions.py ledger_100m.csv --rows 100000000 --schema v3
+
+Distributions are fitted to a sample csv (ccTransactions_prepocessed.csv by default, the
+one layout with every field):
+
+- MCC by its frequency in the sample, Amount log-normal per MCC (fitted on the sample's
+  amounts for that MCC, the whole sample's for rare MCCs), with the sample's share of
+  missing amounts
+- each user gets a home location (Merchant City/State/Zip drawn by frequency) and buys
+  there as often as the sample buys at its most common location, elsewhere at a location
+  drawn by frequency
+- each user has 1-5 cards with their own usage weights
+- Year between the sample's first and last year, Month by its frequency, Day uniform in
+  the month, Time by the sample's hour frequencies with a uniform minute
+
+Rows are generated chunk_size at a time with NumPy and written as they are made, so
+memory stays constant whatever the row count, and every chunk has its own generator
+seeded from (seed, chunk number) so the same arguments always give the same ledger.
+Within a chunk rows come ordered by user, then date and time, like the samples.
+"""
+import argparse
+import calendar
+import os
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ccTransactions_prepocessed.csv')
+SCHEMA_COLUMNS = {
+    'v1': ['User', 'Card', 'Year', 'Month', 'Day', 'Time', 'Amount', 'Merchant City', 'Merchant State', 'Zip', 'MCC'],
+    'v2': ['User', 'Card', 'Time', 'Amount', 'Merchant City', 'Merchant State', 'Zip', 'MCC', 'Date'],
+    'v3': ['User', 'Card', 'Time', 'Amount', 'Merchant City', 'Merchant State', 'Zip', 'MCC', 'Month', 'Day'],
+}
+MIN_MCC_SAMPLES = 5  # fewer amounts than this and an MCC uses the whole sample's fit
+DAYS_IN_MONTH = np.array([0] + [calendar.monthrange(2001, month)[1] for month in range(1, 13)])
+
+
+class TransactionGenerator:
+    def __init__(self, sample_csv=SAMPLE_CSV, rows_per_user=500):
+        """
+        Parameters:
+        sample_csv (str): v1 layout csv (User, Card, Year, Month, Day, Time, Amount,
+            Merchant City, Merchant State, Zip, MCC) the distributions are fitted to
+        rows_per_user (float): Mean transactions per user
+        """
+        sample = pd.read_csv(sample_csv, dtype={'Time': 'float64'})
+        self.rows_per_user = rows_per_user
+
+        mcc_counts = sample['MCC'].value_counts()
+        self.mcc = mcc_counts.index.to_numpy(dtype=np.int64)
+        self.mcc_p = (mcc_counts / mcc_counts.sum()).to_numpy()
+
+        amounts = sample[['MCC', 'Amount']].dropna()
+        amounts = amounts[amounts['Amount'] > 0]
+        logs = np.log(amounts['Amount'])
+        overall = (logs.mean(), logs.std(ddof=0) or 1.0)
+        per_mcc = logs.groupby(amounts['MCC']).agg(['mean', 'std', 'count'])
+        self.log_mean = np.full(len(self.mcc), overall[0])
+        self.log_std = np.full(len(self.mcc), overall[1])
+        for i, mcc in enumerate(self.mcc):
+            if mcc in per_mcc.index and per_mcc.loc[mcc, 'count'] >= MIN_MCC_SAMPLES:
+                self.log_mean[i] = per_mcc.loc[mcc, 'mean']
+                self.log_std[i] = per_mcc.loc[mcc, 'std'] if per_mcc.loc[mcc, 'std'] > 0 else overall[1]
+        self.missing_amount = sample['Amount'].isna().mean()
+
+        locations = sample.groupby(['Merchant City', 'Merchant State', 'Zip']).size().sort_values(ascending=False)
+        self.locations = locations.index.to_frame(index=False)
+        self.location_p = (locations / locations.sum()).to_numpy()
+        self.home_share = self.location_p[0]
+
+        self.years = (int(sample['Year'].min()), int(sample['Year'].max()))
+        month_counts = sample['Month'].value_counts().reindex(range(1, 13), fill_value=0) + 1
+        self.month_p = (month_counts / month_counts.sum()).to_numpy()
+        hours = (sample['Time'].dropna() // 100).astype(np.int64).clip(0, 23)
+        hour_counts = hours.value_counts().reindex(range(24), fill_value=0) + 1
+        self.hour_p = (hour_counts / hour_counts.sum()).to_numpy()
+
+    def _user_counts(self, rng, rows):
+        # Poisson transactions per user until the chunk is full, the last user cut short
+        counts = np.empty(0, dtype=np.int64)
+        while counts.sum() < rows:
+            more = rng.poisson(self.rows_per_user, max(16, int(2 * rows / self.rows_per_user)))
+            counts = np.concatenate([counts, more[more > 0]])
+        ends = np.cumsum(counts)
+        users = int(np.searchsorted(ends, rows)) + 1
+        counts = counts[:users]
+        counts[-1] -= ends[users - 1] - rows
+        return counts
+
+    def chunk(self, rows, first_user, rng, schema='v3'):
+        """
+        One chunk of rows for users numbered from first_user.
+
+        Returns:
+        tuple: (DataFrame in the schema's columns, next unused user number)
+        """
+        counts = self._user_counts(rng, rows)
+        n_users = len(counts)
+        user = np.repeat(np.arange(n_users), counts)
+
+        # per user: home location and card weights
+        home = rng.choice(len(self.locations), n_users, p=self.location_p)
+        n_cards = rng.integers(1, 6, n_users)
+        card_weights = rng.dirichlet(np.ones(5), n_users) * (np.arange(5) < n_cards[:, None])
+        card_cdf = np.cumsum(card_weights / card_weights.sum(axis=1, keepdims=True), axis=1)
+        card = (rng.random(rows)[:, None] > card_cdf[user]).sum(axis=1).clip(0, 4)
+
+        mcc_index = rng.choice(len(self.mcc), rows, p=self.mcc_p)
+        amount = np.round(np.exp(rng.normal(self.log_mean[mcc_index], self.log_std[mcc_index])), 2)
+        amount[rng.random(rows) < self.missing_amount] = np.nan
+        location = np.where(rng.random(rows) < self.home_share, home[user],
+                            rng.choice(len(self.locations), rows, p=self.location_p))
+
+        year = rng.integers(self.years[0], self.years[1] + 1, rows)
+        month = rng.choice(np.arange(1, 13), rows, p=self.month_p)
+        day = 1 + (rng.random(rows) * DAYS_IN_MONTH[month]).astype(np.int64)
+        time = rng.choice(24, rows, p=self.hour_p) * 100 + rng.integers(0, 60, rows)
+
+        order = np.lexsort((time, day, month, year, user))
+        places = self.locations.iloc[location[order]]
+        df = pd.DataFrame({
+            'User': first_user + user[order],
+            'Card': card[order],
+            'Year': year[order],
+            'Month': month[order],
+            'Day': day[order],
+            'Time': time[order],
+            'Amount': amount[order],
+            'Merchant City': places['Merchant City'].to_numpy(),
+            'Merchant State': places['Merchant State'].to_numpy(),
+            'Zip': places['Zip'].to_numpy(),
+            'MCC': self.mcc[mcc_index[order]],
+        })
+        if schema == 'v1':
+            df['Time'] = pd.Series(df['Time']).map('{:04d}'.format)
+        elif schema == 'v2':
+            df['Date'] = (df['Month'].astype(str) + '/' + df['Day'].astype(str) + '/'
+                          + (df['Year'] % 100).map('{:02d}'.format))
+        return df[SCHEMA_COLUMNS[schema]], first_user + n_users
+
+    def generate(self, rows, schema='v3', seed=0, chunk_size=1000000):
+        """
+        Stream a ledger of `rows` transactions.
+
+        Parameters:
+        rows (int): Total rows
+        schema (str): 'v1', 'v2' or 'v3' csv layout
+        seed (int): Seed, the same arguments always give the same rows
+        chunk_size (int): Rows per yielded DataFrame
+
+        Yields:
+        pd.DataFrame: Consecutive chunks of the ledger
+        """
+        if schema not in SCHEMA_COLUMNS:
+            raise ValueError("schema must be one of %s" % sorted(SCHEMA_COLUMNS))
+        first_user = 0
+        for number, start in enumerate(range(0, rows, chunk_size)):
+            rng = np.random.default_rng([seed, number])
+            df, first_user = self.chunk(min(chunk_size, rows - start), first_user, rng, schema)
+            yield df
+
+    def write(self, path, rows, schema='v3', seed=0, chunk_size=1000000):
+        """
+        Write a ledger to a csv chunk by chunk.
+
+        Returns:
+        str: path
+        """
+        with open(path, 'w', newline='') as f:
+            for number, df in enumerate(self.generate(rows, schema, seed, chunk_size)):
+                df.to_csv(f, index=False, header=number == 0)
+        return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--schema', choices=sorted(SCHEMA_COLUMNS), default='v3')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=1000000)
+    parser.add_argument('--rows-per-user', type=float, default=500)
+    parser.add_argument('--sample', default=SAMPLE_CSV)
+    args = parser.parse_args()
+    TransactionGenerator(args.sample, args.rows_per_user).write(args.output, args.rows, args.schema, args.seed,
+                                                                args.chunk_size)
@@ -0,0 +1,200 @@
+"""
+Typed columnar store for the preprocessed transaction csvs.
+
+A store is a directory holding one raw little-endian binary file per column plus a
+store.json describing dtypes, row count and the dictionaries of the string columns.
+Columns are opened as np.memmap, so reading only the columns an analysis uses touches
+only those files and nothing is parsed twice.
+
+All three csv layouts are accepted:
+    v1: User,Card,Year,Month,Day,Time,Amount,Merchant City,Merchant State,Zip,MCC
+    v2: User,Card,Time,Amount,Merchant City,Merchant State,Zip,MCC,Date   (Date as 9/9/02)
+    v3: User,Card,Time,Amount,Merchant City,Merchant State,Zip,MCC,Month,Day
+v2's Date is split into Year/Month/Day so every store can be read with Month/Day.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import modelsPath  # noqa: F401
+from instrumentation import stage
+
+STORE_META = 'store.json'
+STORE_FORMAT_VERSION = 1
+
+# column -> storage dtype, integer columns use -1 for missing values
+COLUMN_DTYPES = {
+    'User': np.int32,
+    'Card': np.int16,
+    'Year': np.int16,
+    'Month': np.int16,
+    'Day': np.int16,
+    'Time': np.int16,
+    'Amount': np.float32,
+    'Zip': np.int32,
+    'MCC': np.int32,
+}
+DICTIONARY_COLUMNS = ['Merchant City', 'Merchant State']
+
+
+def _columnFile(store_dir, column):
+    return os.path.join(store_dir, column.replace(' ', '_') + '.bin')
+
+
+def _normalizeChunk(chunk):
+    if 'Date' in chunk.columns:
+        dates = pd.to_datetime(chunk.pop('Date'), format='%m/%d/%y', errors='coerce')
+        chunk['Year'] = dates.dt.year
+        chunk['Month'] = dates.dt.month
+        chunk['Day'] = dates.dt.day
+    return chunk
+
+
+def convertCsv(csv_path, store_dir, chunk_size=1000000):
+    """
+    Convert a v1/v2/v3 transactions csv into a columnar store, streaming chunk_size rows
+    at a time so memory stays bounded whatever the csv size.
+
+    Parameters:
+    csv_path (str): Preprocessed transactions csv
+    store_dir (str): Directory to write the store to, created if needed
+    chunk_size (int): Rows parsed per chunk
+
+    Returns:
+    TransactionStore: The new store
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    columns = None
+    dictionaries = {column: {} for column in DICTIONARY_COLUMNS}
+    files = {}
+    rows = 0
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype={'Time': 'float64'}):
+            chunk = _normalizeChunk(chunk)
+            if columns is None:
+                columns = [c for c in chunk.columns if c in COLUMN_DTYPES or c in DICTIONARY_COLUMNS]
+                files = {c: open(_columnFile(store_dir, c), 'wb') for c in columns}
+            for column in columns:
+                values = chunk[column]
+                if column in DICTIONARY_COLUMNS:
+                    # codes index into the dictionary, which only grows with unseen strings
+                    dictionary = dictionaries[column]
+                    codes, uniques = pd.factorize(values)
+                    remap = np.array([dictionary.setdefault(u, len(dictionary)) for u in uniques] + [-1],
+                                     dtype=np.int32)
+                    data = remap[codes]
+                elif COLUMN_DTYPES[column] == np.float32:
+                    data = values.to_numpy(dtype=np.float32)
+                else:
+                    data = pd.to_numeric(values, errors='coerce').fillna(-1).to_numpy().astype(COLUMN_DTYPES[column])
+                data.astype(data.dtype.newbyteorder('<'), copy=False).tofile(files[column])
+            rows += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta = {
+        'format_version': STORE_FORMAT_VERSION,
+        'source': os.path.basename(csv_path),
+        'rows': rows,
+        'columns': {
+            c: {
+                'dtype': 'int32' if c in DICTIONARY_COLUMNS else np.dtype(COLUMN_DTYPES[c]).name,
+                'dictionary': list(dictionaries[c]) if c in DICTIONARY_COLUMNS else None,
+            }
+            for c in (columns or [])
+        },
+    }
+    with open(os.path.join(store_dir, STORE_META), 'w') as f:
+        json.dump(meta, f)
+    return TransactionStore(store_dir)
+
+
+class TransactionStore:
+    """
+    Read side of a columnar store. Columns are memory-mapped on demand.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, STORE_META)) as f:
+            self.meta = json.load(f)
+        if self.meta['format_version'] != STORE_FORMAT_VERSION:
+            raise ValueError("%s: unsupported store format %r" % (store_dir, self.meta['format_version']))
+        self.rows = self.meta['rows']
+        self.columns = list(self.meta['columns'])
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """
+        Zero-copy, read-only view of one stored column (dictionary columns as int32 codes).
+        """
+        if name not in self.meta['columns']:
+            raise KeyError("column %r not in store, available: %s" % (name, self.columns))
+        dtype = np.dtype(self.meta['columns'][name]['dtype']).newbyteorder('<')
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(_columnFile(self.store_dir, name), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def read(self, columns=None, dropna=False):
+        """
+        Load the requested columns into a DataFrame without touching the others.
+
+        Parameters:
+        columns (list, optional): Columns to load, all stored columns if None
+        dropna (bool): Drop rows with a missing value in any loaded column
+
+        Returns:
+        pd.DataFrame: Typed columns, dictionary columns as pandas Categoricals
+        """
+        columns = self.columns if columns is None else list(columns)
+        with stage('load', self.rows):
+            data = {}
+            for name in columns:
+                values = self.column(name)
+                dictionary = self.meta['columns'][name]['dictionary']
+                if dictionary is not None:
+                    data[name] = pd.Categorical.from_codes(np.asarray(values), categories=dictionary)
+                else:
+                    data[name] = np.asarray(values)
+            df = pd.DataFrame(data, columns=columns)
+        if dropna:
+            with stage('dropna', len(df)):
+                missing = np.zeros(len(df), dtype=bool)
+                for name in columns:
+                    if self.meta['columns'][name]['dictionary'] is not None:
+                        missing |= df[name].isna().to_numpy()
+                    elif df[name].dtype.kind == 'f':
+                        missing |= np.isnan(df[name].to_numpy())
+                    else:
+                        missing |= df[name].to_numpy() < 0  # integer columns store missing as -1
+                df = df[~missing].reset_index(drop=True)
+        return df
+
+
+def openStore(csv_path, store_dir=None, chunk_size=1000000):
+    """
+    Open the store for csv_path, converting the csv first if the store is missing or
+    older than the csv.
+
+    Parameters:
+    csv_path (str): Preprocessed transactions csv
+    store_dir (str, optional): Store location, defaults to <csv name>.store next to the csv
+    chunk_size (int): Rows parsed per chunk if a conversion is needed
+
+    Returns:
+    TransactionStore: The up to date store
+    """
+    if store_dir is None:
+        store_dir = os.path.splitext(csv_path)[0] + '.store'
+    meta_path = os.path.join(store_dir, STORE_META)
+    if not os.path.exists(meta_path) or os.path.getmtime(meta_path) < os.path.getmtime(csv_path):
+        with stage('convert') as converting:
+            store = convertCsv(csv_path, store_dir, chunk_size)
+            converting.add_rows(len(store))
+        return store
+    return TransactionStore(store_dir)
@@ -0,0 +1,212 @@
+"""
+Opt-in timers, counters and memory peaks for the ingestion, scoring and clustering stages.
+
+The stages (load, dropna, scale, fit, predict, score, rank) are wrapped in
+`with stage(name, rows):` blocks in the modules that run them. Nothing is measured until
+instrumentation is enabled, and while disabled stage() hands back one shared no-op
+object, so the wrapped hot paths cost a function call and a flag check.
+
+Enable it from code (modelsPath in either model folder puts this file on sys.path):
+
+    import modelsPath  # noqa: F401
+    import instrumentation
+    instrumentation.enable(profile=True, trace_memory=True)
+    ...
+    instrumentation.dump('run.json')   # also run.json.prof / run.json.tracemalloc
+
+or for a whole script through the environment, which dumps when the process exits:
+
+    INSTRUMENT_OUTPUT=run.json INSTRUMENT_PROFILE=1 INSTRUMENT_MEMORY=1 python ccTransactionsKmeans.py
+
+Per stage the report has calls, total seconds, rows, rows/s, process_peak_rss_bytes and,
+with trace_memory, the peak traced allocation during the stage. process_peak_rss_bytes
+is the process' lifetime high-water mark (ru_maxrss) read when the stage last finished,
+not the stage's own peak: it only says the process had reached that much by then, a
+stage that used less than an earlier one reports the earlier one's peak. Use
+trace_memory for per stage peaks. The .prof file is a cProfile dump for pstats/snakeviz, the .tracemalloc file a
+tracemalloc.Snapshot.
+"""
+import atexit
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+_enabled = False
+_stages = {}
+_counters = {}
+_stack = []
+_profiler = None
+_trace_memory = False
+_started = None
+
+
+def _peakRssBytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # kilobytes on Linux
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_rows(self, rows):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows or 0
+        self.peak = 0
+
+    def add_rows(self, rows):
+        """
+        Count rows only known once the stage has run (e.g. after a dropna).
+        """
+        self.rows += rows
+
+    def __enter__(self):
+        if _trace_memory:
+            # the enclosing stage keeps its own peak, then this stage measures from here
+            peak = tracemalloc.get_traced_memory()[1]
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+        _stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        _stack.pop()
+        stats = _stages.setdefault(self.name, {'calls': 0, 'seconds': 0.0, 'rows': 0, 'peak_traced_bytes': None})
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['rows'] += self.rows
+        stats['process_peak_rss_bytes'] = _peakRssBytes()  # lifetime ru_maxrss, see the module docstring
+        if _trace_memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            stats['peak_traced_bytes'] = max(stats['peak_traced_bytes'] or 0, self.peak)
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, self.peak)
+        return False
+
+
+def stage(name, rows=None):
+    """
+    Context manager timing one run of a stage.
+
+    Parameters:
+    name (str): Stage name, runs of the same name are summed
+    rows (int, optional): Rows the stage processes, for rows/s
+
+    Returns:
+    Context manager, whose add_rows(n) counts rows found out inside the block
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, rows)
+
+
+def count(name, n=1):
+    """
+    Add n to a named counter.
+    """
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def enabled():
+    return _enabled
+
+
+def enable(profile=False, trace_memory=False):
+    """
+    Start collecting, from empty.
+
+    Parameters:
+    profile (bool): Also run cProfile over everything until dump()/disable()
+    trace_memory (bool): Trace Python and NumPy allocations for per stage peaks (slows
+        allocation heavy code down noticeably)
+    """
+    global _enabled, _profiler, _trace_memory, _started
+    reset()
+    _enabled = True
+    _started = time.perf_counter()
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if profile:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def disable():
+    global _enabled, _profiler, _trace_memory
+    _enabled = False
+    if _profiler is not None:
+        _profiler.disable()
+    if _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def reset():
+    _stages.clear()
+    _counters.clear()
+
+
+def report():
+    """
+    Everything collected so far.
+
+    Returns:
+    dict: 'stages' (name -> calls, seconds, rows, rows_per_s, process_peak_rss_bytes,
+        peak_traced_bytes), 'counters', 'wall_seconds' since enable()
+    """
+    stages = {}
+    for name, stats in _stages.items():
+        stages[name] = dict(stats, seconds=round(stats['seconds'], 6),
+                            rows_per_s=round(stats['rows'] / stats['seconds'], 1)
+                            if stats['rows'] and stats['seconds'] > 0 else None)
+    return {
+        'wall_seconds': round(time.perf_counter() - _started, 6) if _started is not None else None,
+        'stages': stages,
+        'counters': dict(_counters),
+    }
+
+
+def dump(path):
+    """
+    Write report() as JSON to path, plus path.prof (cProfile) and path.tracemalloc
+    (tracemalloc snapshot) when those were enabled.
+    """
+    with open(path, 'w') as f:
+        json.dump(report(), f, indent=2)
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(path + '.prof')
+        _profiler.enable()
+    if _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.take_snapshot().dump(path + '.tracemalloc')
+
+
+if os.environ.get('INSTRUMENT_OUTPUT'):
+    enable(profile=os.environ.get('INSTRUMENT_PROFILE') == '1', trace_memory=os.environ.get('INSTRUMENT_MEMORY') == '1')
+    atexit.register(dump, os.environ['INSTRUMENT_OUTPUT'])